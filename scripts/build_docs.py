@@ -6,37 +6,56 @@
 """
 
 import os
+import re
 import sys
+import shlex
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
 from pathlib import Path
 
 def run_command(cmd: str, cwd: Path = None) -> bool:
     """运行命令并返回是否成功"""
     try:
         print(f"🔧 运行命令: {cmd}")
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
+        # 不经过shell，使CPython可走posix_spawn快速路径
+        # 逐行转发输出，避免缓冲全部日志并能实时看到进度
+        proc = subprocess.Popen(
+            shlex.split(cmd), 
             cwd=cwd, 
-            capture_output=True, 
-            text=True
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.STDOUT, 
+            text=True, 
+            bufsize=1
         )
+        for line in proc.stdout:
+            sys.stdout.write(line)
+        returncode = proc.wait()
         
-        if result.returncode == 0:
+        if returncode == 0:
             print(f"✅ 命令成功: {cmd}")
-            if result.stdout:
-                print(result.stdout)
             return True
         else:
             print(f"❌ 命令失败: {cmd}")
-            print(f"错误输出: {result.stderr}")
             return False
             
     except Exception as e:
         print(f"❌ 执行命令时出错: {e}")
         return False
 
+def normalize_name(name: str) -> str:
+    """按PEP 503规范化包名"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def installed_distributions() -> dict:
+    """返回已安装的发行包: 规范化名称 -> 版本"""
+    return {
+        normalize_name(dist.metadata["Name"]): dist.version
+        for dist in metadata.distributions()
+        if dist.metadata["Name"]
+    }
+
 def check_dependencies() -> bool:
     """检查依赖是否安装"""
     print("📦 检查依赖...")
@@ -50,23 +69,28 @@ def check_dependencies() -> bool:
     
     missing_deps = []
     
+    # 一次性读取已安装包元数据，无需导入模块本身
+    installed = installed_distributions()
     for dep in dependencies:
-        try:
-            __import__(dep.replace('-', '_'))
-            print(f"✅ {dep} 已安装")
-        except ImportError:
+        if normalize_name(dep) in installed:
+            print(f"✅ {dep} 已安装 ({installed[normalize_name(dep)]})")
+        else:
             missing_deps.append(dep)
             print(f"❌ {dep} 未安装")
     
     if missing_deps:
+        # 仅安装缺失的依赖，使用与检查时相同的解释器安装
         print(f"📥 安装缺失的依赖: {' '.join(missing_deps)}")
-        cmd = f"pip install {' '.join(missing_deps)}"
+        cmd = f"{shlex.quote(sys.executable)} -m pip install {' '.join(missing_deps)}"
         return run_command(cmd)
     
     return True
 
-def build_docs(project_root: Path) -> bool:
-    """构建文档"""
+def build_docs(project_root: Path, clean: bool = False) -> bool:
+    """构建文档
+
+    clean为False时使用 --dirty 增量构建，仅重新生成有变化的页面
+    """
     print("🏗️ 构建文档...")
     
     # 检查mkdocs.yml是否存在
@@ -76,7 +100,8 @@ def build_docs(project_root: Path) -> bool:
         return False
     
     # 构建文档
-    return run_command("mkdocs build --clean", cwd=project_root)
+    flag = "--clean" if clean else "--dirty"
+    return run_command(f"mkdocs build {flag}", cwd=project_root)
 
 def serve_docs(project_root: Path) -> bool:
     """启动文档服务器"""
@@ -86,8 +111,7 @@ def serve_docs(project_root: Path) -> bool:
     
     try:
         subprocess.run(
-            "mkdocs serve", 
-            shell=True, 
+            shlex.split("mkdocs serve"), 
             cwd=project_root
         )
         return True
@@ -98,6 +122,27 @@ def serve_docs(project_root: Path) -> bool:
         print(f"❌ 启动服务器时出错: {e}")
         return False
 
+def _stat_files(root: Path, rel_paths: list) -> dict:
+    """批量获取文件状态: 相对路径 -> os.stat_result
+
+    每个父目录只执行一次 os.scandir，缺失的文件不会出现在结果中
+    """
+    by_dir = {}
+    for rel in rel_paths:
+        parent, _, name = rel.rpartition("/")
+        by_dir.setdefault(parent, set()).add(name)
+    
+    stats = {}
+    for parent, names in by_dir.items():
+        try:
+            with os.scandir(root / parent) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        stats[f"{parent}/{entry.name}" if parent else entry.name] = entry.stat()
+        except OSError:
+            continue
+    return stats
+
 def validate_docs(project_root: Path) -> bool:
     """验证文档"""
     print("🔍 验证文档...")
@@ -114,10 +159,10 @@ def validate_docs(project_root: Path) -> bool:
         "api-reference/index.html"
     ]
     
+    file_stats = _stat_files(site_dir, required_files)
     missing_files = []
     for file_path in required_files:
-        full_path = site_dir / file_path
-        if full_path.exists():
+        if file_path in file_stats:
             print(f"✅ {file_path}")
         else:
             missing_files.append(file_path)
@@ -128,21 +173,47 @@ def validate_docs(project_root: Path) -> bool:
         return False
     
     # 检查文件大小
-    index_file = site_dir / "index.html"
-    if index_file.stat().st_size < 1000:
+    if file_stats["index.html"].st_size < 1000:
         print("⚠️ index.html文件过小，可能构建不完整")
         return False
     
     print("✅ 文档验证通过")
     return True
 
+def fast_rmtree(root: Path) -> None:
+    """并行删除目录树，适用于包含大量文件的site目录"""
+    if os.name == "nt":
+        shutil.rmtree(root)
+        return
+    
+    dirs = []
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        futures = []
+        for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+            for name in filenames:
+                futures.append(pool.submit(os.unlink, os.path.join(dirpath, name)))
+            # 目录的符号链接不会被os.walk进入，直接删除链接本身
+            for name in dirnames:
+                path = os.path.join(dirpath, name)
+                if os.path.islink(path):
+                    futures.append(pool.submit(os.unlink, path))
+                else:
+                    dirs.append(path)
+        for future in futures:
+            future.result()
+    
+    # topdown=False保证子目录先于父目录
+    for path in dirs:
+        os.rmdir(path)
+    os.rmdir(root)
+
 def clean_docs(project_root: Path) -> bool:
     """清理文档"""
     print("🧹 清理文档...")
     
     site_dir = project_root / "site"
     if site_dir.exists():
-        shutil.rmtree(site_dir)
+        fast_rmtree(site_dir)
         print("✅ 已清理site目录")
     
     return True
@@ -160,6 +231,7 @@ def main():
 
 命令:
   build    - 构建文档
+  build-dirty - 增量构建文档 (仅重建变更页面)
   serve    - 启动文档服务器
   validate - 验证文档
   clean    - 清理文档
@@ -182,6 +254,9 @@ def main():
     success = True
     
     if command == "build":
+        success = check_dependencies() and build_docs(project_root, clean=True)
+    
+    elif command == "build-dirty":
         success = check_dependencies() and build_docs(project_root)
     
     elif command == "serve":
@@ -197,7 +272,7 @@ def main():
         success = (
             check_dependencies() and
             clean_docs(project_root) and
-            build_docs(project_root) and
+            build_docs(project_root, clean=True) and
             validate_docs(project_root)
         )
     
@@ -209,7 +284,7 @@ def main():
     if success:
         print("🎉 操作完成！")
         
-        if command in ["build", "all"]:
+        if command in ["build", "build-dirty", "all"]:
             print("\n📍 下一步:")
             print("  - 运行 'python scripts/build_docs.py serve' 预览文档")
             print("  - 或推送到GitHub自动部署到GitHub Pages")
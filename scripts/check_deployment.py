@@ -5,20 +5,36 @@
 检查GitHub Pages部署状态和文档可访问性
 """
 
-import requests
-import time
+import asyncio
+import httpx
 import sys
 from urllib.parse import urljoin
 
-def check_url(url: str, timeout: int = 10) -> tuple[bool, int, str]:
-    """检查URL是否可访问"""
-    try:
-        response = requests.get(url, timeout=timeout)
-        return True, response.status_code, response.reason
-    except requests.exceptions.RequestException as e:
-        return False, 0, str(e)
+try:
+    import h2  # noqa: F401  httpx的HTTP/2支持依赖h2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
-def check_github_pages_deployment():
+async def check_url(
+    client: httpx.AsyncClient,
+    url: str,
+    timeout: int = 10,
+    retries: int = 2,
+    backoff_factor: float = 0.3,
+) -> tuple[bool, int, str]:
+    """检查URL是否可访问，连接失败时按指数退避重试"""
+    for attempt in range(retries + 1):
+        try:
+            response = await client.get(url, timeout=timeout)
+            return True, response.status_code, response.reason_phrase
+        except httpx.HTTPError as e:
+            if attempt == retries:
+                return False, 0, str(e) or type(e).__name__
+            await asyncio.sleep(backoff_factor * (2 ** attempt))
+    return False, 0, "未发起请求"
+
+async def check_github_pages_deployment():
     """检查GitHub Pages部署状态"""
     base_url = "https://agions.github.io/dramacraft"
 
@@ -35,13 +51,20 @@ def check_github_pages_deployment():
     ]
     
     results = []
+    urls = [urljoin(base_url + "/", path.lstrip("/")) for _, path in pages_to_check]
+    
+    # 并发检查，所有请求共享一个客户端；HTTP/2下多个请求复用同一TLS连接，
+    # 连接数上限同时限制了对同一主机的请求速率
+    limits = httpx.Limits(max_connections=2, max_keepalive_connections=2, keepalive_expiry=30)
+    # 与requests.get一致跟随重定向，http→https或补全末尾斜杠不应判为失败
+    async with httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE, limits=limits, follow_redirects=True
+    ) as client:
+        checks = await asyncio.gather(*[check_url(client, url) for url in urls])
     
-    for page_name, path in pages_to_check:
-        full_url = urljoin(base_url + "/", path.lstrip("/"))
+    for (page_name, _), full_url, (success, status_code, reason) in zip(pages_to_check, urls, checks):
         print(f"🌐 检查 {page_name}: {full_url}")
         
-        success, status_code, reason = check_url(full_url)
-        
         if success:
             if status_code == 200:
                 print(f"  ✅ 成功 (HTTP {status_code})")
@@ -52,8 +75,6 @@ def check_github_pages_deployment():
         else:
             print(f"  ❌ 失败: {reason}")
             results.append((page_name, False, 0))
-        
-        time.sleep(1)  # 避免请求过快
     
     print("-" * 60)
     
@@ -98,7 +119,7 @@ def main():
     print("=" * 60)
     
     # 检查部署状态
-    deployment_success = check_github_pages_deployment()
+    deployment_success = asyncio.run(check_github_pages_deployment())
     
     # 显示GitHub Actions信息
     check_github_actions_status()
@@ -5,26 +5,140 @@
 检查文档中的内部和外部链接有效性
 """
 
+import os
 import re
 import sys
+import time
 import asyncio
 import aiohttp
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Set
-from urllib.parse import urljoin, urlparse
+from typing import Callable, List, Dict, Optional, Tuple, Set
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
+
+# 缓存读写优先使用orjson，未安装时回退到标准库json
+try:
+    import orjson
+    _jloads = orjson.loads
+    _jdumps = orjson.dumps
+except ImportError:
+    import json
+    _jloads = json.loads
+
+    def _jdumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# Markdown链接 [text](url) 与 HTML链接 href="url"
+_MD_LINK_RE = re.compile(r'\[([^\]]*)\]\(([^)]+)\)')
+_HTML_HREF_RE = re.compile(r'''href=["']([^"']+)["']''')
+
+# 扫描文档时跳过的目录
+_SKIP_DIRS = {'site', '__pycache__', 'node_modules'}
+
+# 无需联网检查的主机（本地、示例地址）
+_SKIP_HOSTS = {'localhost', '127.0.0.1', '0.0.0.0', 'example.com'}
+_SKIP_PATTERNS = [
+    re.compile(r'^https?://(?:10\.|192\.168\.|172\.(?:1[6-9]|2\d|3[01])\.)'),
+]
+
+# 响应慢或限流严重的主机使用更短的超时（秒）
+_HOST_TIMEOUTS = {'twitter.com': 3, 'x.com': 3}
+_DEFAULT_TIMEOUT = 10
+
+# 并发检查外部链接的工作协程数，同时也是并发请求的上限，避免压垮目标服务器
+_HTTP_WORKERS = 20
+
+# 外部链接检查结果缓存有效期（秒）
+CACHE_TTL = 7 * 86400
+
+def _normalize(url: str) -> str:
+    """规范化外部链接，合并只有细微差别的重复URL"""
+    parts = urlparse(url)
+    path = parts.path or '/'
+    if path.endswith('/') and path != '/':
+        path = path.rstrip('/')
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith('utm_')
+    ])
+    return urlunparse((parts.scheme.lower(), parts.netloc.lower(), path, parts.params, query, ''))
 
 class LinkChecker:
-    def __init__(self, docs_dir: Path):
+    __slots__ = (
+        'docs_dir', 'base_url', 'internal_links', 'external_links', 'valid_pages',
+        'broken_types', 'broken_files', 'broken_urls', 'broken_reasons', '_external_keys',
+        'force', 'cache_file', 'cache', '_file_links_cache', '_md_files',
+    )
+    
+    def __init__(self, docs_dir: Path, force: bool = False):
         self.docs_dir = docs_dir
         self.base_url = "https://agions.github.io/dramacraft/"
         self.internal_links: Set[str] = set()
         self.external_links: Set[str] = set()
-        self.broken_links: List[Dict] = []
+        # 已入队外部链接的规范化形式，仅用于去重
+        self._external_keys: Set[str] = set()
+        # 无效链接按列存储，避免每条记录一个字典
+        self.broken_types: List[str] = []
+        self.broken_files: List[str] = []
+        self.broken_urls: List[str] = []
+        self.broken_reasons: List[str] = []
         self.valid_pages: Set[str] = set()
         
+        # 外部链接检查缓存: URL -> {status, etag, last_modified, checked_at}
+        self.force = force
+        self.cache_file = docs_dir.parent / ".cache" / "link_check.json"
+        self.cache: Dict[str, Dict] = {}
+        if self.cache_file.exists():
+            try:
+                self.cache = _jloads(self.cache_file.read_bytes())
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 读取链接缓存失败，将重新检查: {e}")
+        
+        # 每个文件提取出的 (内部链接, 外部链接)
+        self._file_links_cache: Dict[Path, Tuple[List[str], List[str]]] = {}
+        self._md_files: List[Path] = []
+    
+    def _discover(self) -> None:
+        """遍历一次文档目录，收集所有Markdown文件"""
+        md_files = []
+        stack = [self.docs_dir]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError as e:
+                print(f"读取目录失败: {e}")
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(Path(entry.path))
+                    elif entry.name.endswith('.md'):
+                        md_files.append(Path(entry.path))
+        self._md_files = sorted(md_files)
+    
+    def _scan_all(self, on_external: Optional[Callable[[List[str]], None]] = None) -> None:
+        """并行提取所有文件的链接
+
+        on_external 在工作线程中被调用，用于把提取到的外部链接及时交给检查流程
+        """
+        def scan(md_file: Path) -> Tuple[List[str], List[str]]:
+            links = self.extract_links_from_file(md_file)
+            if on_external is not None and links[1]:
+                on_external(links[1])
+            return links
+        
+        with ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 4) as pool:
+            results = pool.map(scan, self._md_files)
+            self._file_links_cache = dict(zip(self._md_files, results))
+        
+        self.collect_pages()
+        
     def collect_pages(self) -> None:
         """收集所有有效页面"""
-        for md_file in self.docs_dir.rglob("*.md"):
+        for md_file in self._file_links_cache:
             rel_path = md_file.relative_to(self.docs_dir)
             
             # 转换为URL路径
@@ -55,10 +169,10 @@ class LinkChecker:
             return [], []
         
         # 提取Markdown链接
-        md_links = re.findall(r'\[([^\]]*)\]\(([^)]+)\)', content)
+        md_links = _MD_LINK_RE.findall(content)
         
         # 提取HTML链接
-        html_links = re.findall(r'href=["\']([^"\']+)["\']', content)
+        html_links = _HTML_HREF_RE.findall(content)
         
         internal_links = []
         external_links = []
@@ -94,13 +208,19 @@ class LinkChecker:
             else:
                 return str(current_dir / link)
     
-    def check_internal_links(self) -> None:
-        """检查内部链接"""
+    def _add_broken(self, link_type: str, file: str, url: str, reason: str) -> None:
+        """记录一个无效链接"""
+        self.broken_types.append(link_type)
+        self.broken_files.append(file)
+        self.broken_urls.append(url)
+        self.broken_reasons.append(reason)
+    
+    def _find_broken_internal_links(self) -> List[Tuple[str, str, str]]:
+        """查找无效的内部链接，返回 (文件, 链接, 原因) 列表"""
         print("🔍 检查内部链接...")
         
-        for md_file in self.docs_dir.rglob("*.md"):
-            internal_links, _ = self.extract_links_from_file(md_file)
-            
+        broken = []
+        for md_file, (internal_links, _) in self._file_links_cache.items():
             for link in internal_links:
                 normalized_link = self.normalize_internal_link(link, md_file)
                 
@@ -116,64 +236,140 @@ class LinkChecker:
                 found = any(path in self.valid_pages for path in check_paths)
                 
                 if not found:
-                    self.broken_links.append({
-                        'type': 'internal',
-                        'file': str(md_file.relative_to(self.docs_dir)),
-                        'link': link,
-                        'normalized': normalized_link,
-                        'reason': 'Page not found'
-                    })
+                    broken.append((str(md_file.relative_to(self.docs_dir)), link, 'Page not found'))
+        return broken
     
     async def check_external_link(self, session: aiohttp.ClientSession, url: str) -> Tuple[str, bool, str]:
         """检查单个外部链接"""
+        host = urlparse(url).hostname or ''
+        if host in _SKIP_HOSTS or any(pattern.match(url) for pattern in _SKIP_PATTERNS):
+            return url, True, "skipped"
+        
+        entry = self.cache.get(url)
+        if entry and not self.force and entry.get('status', 999) < 400:
+            if time.time() - entry.get('checked_at', 0) < CACHE_TTL:
+                return url, True, f"OK ({entry['status']}, cached)"
+        
+        # 使用条件请求，未变化的资源返回304
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        timeout = aiohttp.ClientTimeout(total=_HOST_TIMEOUTS.get(host, _DEFAULT_TIMEOUT))
         try:
-            async with session.head(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status < 400:
-                    return url, True, f"OK ({response.status})"
-                else:
-                    return url, False, f"HTTP {response.status}"
+            async with session.head(url, allow_redirects=True, timeout=timeout, headers=headers) as response:
+                status = response.status
+                etag = response.headers.get('ETag', '')
+                last_modified = response.headers.get('Last-Modified', '')
+            
+            # 部分服务器不支持HEAD请求，回退到GET
+            if status in (400, 403, 405):
+                async with session.get(url, allow_redirects=True, timeout=timeout, headers=headers) as response:
+                    await response.content.read(0)
+                    status = response.status
+                    etag = response.headers.get('ETag', '')
+                    last_modified = response.headers.get('Last-Modified', '')
+            
+            if status == 304 and entry:
+                # 未修改，沿用缓存中的校验信息
+                status = entry.get('status', status)
+                etag = etag or entry.get('etag', '')
+                last_modified = last_modified or entry.get('last_modified', '')
+            
+            self.cache[url] = {
+                'status': status,
+                'etag': etag,
+                'last_modified': last_modified,
+                'checked_at': time.time(),
+            }
+            
+            if status < 400:
+                return url, True, f"OK ({status})"
+            else:
+                return url, False, f"HTTP {status}"
         except asyncio.TimeoutError:
             return url, False, "Timeout"
         except Exception as e:
             return url, False, str(e)
     
-    async def check_external_links(self) -> None:
-        """检查外部链接"""
-        print("🌐 检查外部链接...")
+    async def _http_worker(self, session: aiohttp.ClientSession, queue: asyncio.Queue) -> None:
+        """从队列中取出外部链接并检查"""
+        while True:
+            url = await queue.get()
+            try:
+                _, is_valid, reason = await self.check_external_link(session, url)
+                if not is_valid:
+                    self._add_broken('external', '', url, reason)
+            except Exception as e:
+                print(f"检查链接 {url} 出错: {e}")
+            finally:
+                queue.task_done()
+    
+    async def check_links(self) -> None:
+        """扫描文件并检查所有链接
+
+        文件读取在线程池中进行，提取到的外部链接立即进入队列由HTTP工作协程检查，
+        使磁盘I/O、内部链接检查与网络请求相互重叠
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
         
-        # 收集所有外部链接
-        all_external_links = set()
-        for md_file in self.docs_dir.rglob("*.md"):
-            _, external_links = self.extract_links_from_file(md_file)
-            all_external_links.update(external_links)
+        def enqueue(urls: List[str]) -> None:
+            # 在事件循环线程中执行，保证去重集合无竞争
+            # 按规范化形式去重，但检查和报告的仍是首次出现的原始URL
+            for url in urls:
+                key = _normalize(url)
+                if key not in self._external_keys:
+                    self._external_keys.add(key)
+                    self.external_links.add(url)
+                    queue.put_nowait(url)
         
-        if not all_external_links:
-            print("✅ 未找到外部链接")
-            return
+        def on_external(urls: List[str]) -> None:
+            loop.call_soon_threadsafe(enqueue, urls)
         
-        # 异步检查链接
-        async with aiohttp.ClientSession() as session:
-            tasks = [self.check_external_link(session, url) for url in all_external_links]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        print("🌐 检查外部链接...")
+        connector = aiohttp.TCPConnector(limit=50, limit_per_host=4, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            workers = [
+                loop.create_task(self._http_worker(session, queue))
+                for _ in range(_HTTP_WORKERS)
+            ]
+            try:
+                await loop.run_in_executor(None, self._scan_all, on_external)
+                print(f"📄 发现 {len(self.valid_pages)} 个有效页面")
+                
+                # 外部链接请求进行的同时在线程中检查内部链接，不阻塞事件循环；
+                # 结果回到事件循环线程再记录，避免与HTTP工作协程交错写入
+                broken_internal, _ = await asyncio.gather(
+                    asyncio.to_thread(self._find_broken_internal_links),
+                    queue.join(),
+                )
+                for file, link, reason in broken_internal:
+                    self._add_broken('internal', file, link, reason)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
         
-        # 处理结果
-        for result in results:
-            if isinstance(result, Exception):
-                continue
-            
-            url, is_valid, reason = result
-            if not is_valid:
-                self.broken_links.append({
-                    'type': 'external',
-                    'link': url,
-                    'reason': reason
-                })
+        if not self.external_links:
+            print("✅ 未找到外部链接")
+    
+    def save_cache(self) -> None:
+        """保存外部链接检查缓存"""
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_bytes(_jdumps(self.cache))
+        except OSError as e:
+            print(f"⚠️ 保存链接缓存失败: {e}")
     
     def generate_report(self) -> str:
         """生成检查报告"""
         report = "# 🔗 链接检查报告\n\n"
         
-        if not self.broken_links:
+        if not self.broken_types:
             report += "✅ **所有链接都有效！**\n\n"
             report += f"- 检查了 {len(self.valid_pages)} 个页面\n"
             report += f"- 所有内部链接都指向有效页面\n"
@@ -181,21 +377,21 @@ class LinkChecker:
             return report
         
         # 分类统计
-        internal_broken = [link for link in self.broken_links if link['type'] == 'internal']
-        external_broken = [link for link in self.broken_links if link['type'] == 'external']
+        internal_broken = [i for i, t in enumerate(self.broken_types) if t == 'internal']
+        external_broken = [i for i, t in enumerate(self.broken_types) if t == 'external']
         
-        report += f"❌ **发现 {len(self.broken_links)} 个无效链接**\n\n"
+        report += f"❌ **发现 {len(self.broken_types)} 个无效链接**\n\n"
         
         if internal_broken:
             report += f"## 内部链接问题 ({len(internal_broken)}个)\n\n"
-            for link in internal_broken:
-                report += f"- **{link['file']}**: `{link['link']}` - {link['reason']}\n"
+            for i in internal_broken:
+                report += f"- **{self.broken_files[i]}**: `{self.broken_urls[i]}` - {self.broken_reasons[i]}\n"
             report += "\n"
         
         if external_broken:
             report += f"## 外部链接问题 ({len(external_broken)}个)\n\n"
-            for link in external_broken:
-                report += f"- `{link['link']}` - {link['reason']}\n"
+            for i in external_broken:
+                report += f"- `{self.broken_urls[i]}` - {self.broken_reasons[i]}\n"
             report += "\n"
         
         return report
@@ -204,15 +400,10 @@ class LinkChecker:
         """运行完整检查"""
         print("🚀 开始链接检查...")
         
-        # 收集页面
-        self.collect_pages()
-        print(f"📄 发现 {len(self.valid_pages)} 个有效页面")
-        
-        # 检查内部链接
-        self.check_internal_links()
-        
-        # 检查外部链接
-        await self.check_external_links()
+        # 扫描文件并检查内部、外部链接
+        self._discover()
+        await self.check_links()
+        self.save_cache()
         
         # 生成报告
         report = self.generate_report()
@@ -226,7 +417,7 @@ class LinkChecker:
         print(f"📋 报告已保存: {report_file}")
         
         # 返回是否有问题
-        return len(self.broken_links) == 0
+        return len(self.broken_types) == 0
 
 async def main():
     """主函数"""
@@ -236,7 +427,8 @@ async def main():
         print("❌ 文档目录不存在")
         sys.exit(1)
     
-    checker = LinkChecker(docs_dir)
+    # --force 忽略缓存，重新检查所有外部链接
+    checker = LinkChecker(docs_dir, force="--force" in sys.argv[1:])
     success = await checker.run_check()
     
     if success:
@@ -5,33 +5,39 @@ DramaCraft 开发工具
 本地开发和测试的便捷脚本
 """
 
-import os
 import sys
+import shlex
 import subprocess
-import shutil
 from pathlib import Path
 
+from build_docs import fast_rmtree, installed_distributions, normalize_name
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SITE_DIR = PROJECT_ROOT / "site"
+
 def run_command(cmd: str, cwd: Path = None) -> bool:
     """运行命令并返回是否成功"""
     try:
         print(f"🔧 运行: {cmd}")
-        result = subprocess.run(
-            cmd, 
-            shell=True, 
+        # 不经过shell，使CPython可走posix_spawn快速路径
+        # 逐行转发输出，避免缓冲全部日志并能实时看到进度
+        proc = subprocess.Popen(
+            shlex.split(cmd), 
             cwd=cwd, 
-            capture_output=True, 
-            text=True
+            stdout=subprocess.PIPE, 
+            stderr=subprocess.STDOUT, 
+            text=True, 
+            bufsize=1
         )
+        for line in proc.stdout:
+            sys.stdout.write(line)
+        returncode = proc.wait()
         
-        if result.returncode == 0:
+        if returncode == 0:
             print(f"✅ 成功")
-            if result.stdout:
-                print(result.stdout)
             return True
         else:
             print(f"❌ 失败")
-            if result.stderr:
-                print(f"错误: {result.stderr}")
             return False
             
     except Exception as e:
@@ -47,17 +53,29 @@ def install_deps():
         "ruff",
         "mypy",
         "pytest",
-        "requests"
+        "pytest-xdist",
+        "pytest-forked",
+        "httpx[http2]"
     ]
     
-    cmd = f"/usr/bin/python3 -m pip install --user {' '.join(deps)}"
+    # 跳过已安装的依赖，只把缺失的交给pip解析
+    installed = installed_distributions()
+    missing = [dep for dep in deps if normalize_name(dep.split("[")[0]) not in installed]
+    
+    if not missing:
+        print("✅ 依赖已全部安装")
+        return True
+    
+    # 检查的是当前解释器的已安装包，因此也用当前解释器安装；虚拟环境中不能使用--user
+    user_flag = " --user" if sys.prefix == sys.base_prefix else ""
+    cmd = f"{shlex.quote(sys.executable)} -m pip install{user_flag} {' '.join(missing)}"
     return run_command(cmd)
 
-def build_docs():
-    """构建文档"""
+def build_docs(clean: bool = False):
+    """构建文档 (默认 --dirty 增量构建)"""
     print("🏗️ 构建文档...")
-    project_root = Path(__file__).parent.parent
-    return run_command("/usr/bin/python3 -m mkdocs build --clean", cwd=project_root)
+    flag = "--clean" if clean else "--dirty"
+    return run_command(f"/usr/bin/python3 -m mkdocs build {flag}", cwd=PROJECT_ROOT)
 
 def serve_docs():
     """启动文档服务器"""
@@ -65,35 +83,33 @@ def serve_docs():
     print("📍 访问 http://localhost:8000")
     print("⏹️ 按 Ctrl+C 停止")
     
-    project_root = Path(__file__).parent.parent
     try:
-        subprocess.run("/usr/bin/python3 -m mkdocs serve", shell=True, cwd=project_root)
+        subprocess.run(shlex.split("/usr/bin/python3 -m mkdocs serve"), cwd=PROJECT_ROOT)
     except KeyboardInterrupt:
         print("\n🛑 服务器已停止")
 
 def clean():
     """清理构建文件"""
     print("🧹 清理构建文件...")
-    project_root = Path(__file__).parent.parent
     
     # 清理目录
     clean_dirs = [
-        project_root / "site",
-        project_root / "__pycache__",
-        project_root / ".pytest_cache",
-        project_root / ".mypy_cache",
-        project_root / ".ruff_cache"
+        SITE_DIR,
+        PROJECT_ROOT / "__pycache__",
+        PROJECT_ROOT / ".pytest_cache",
+        PROJECT_ROOT / ".mypy_cache",
+        PROJECT_ROOT / ".ruff_cache"
     ]
     
     for dir_path in clean_dirs:
         if dir_path.exists():
-            shutil.rmtree(dir_path)
+            fast_rmtree(dir_path)
             print(f"✅ 已清理: {dir_path.name}")
     
     # 清理文件
     clean_files = [
-        project_root / ".coverage",
-        project_root / "coverage.xml"
+        PROJECT_ROOT / ".coverage",
+        PROJECT_ROOT / "coverage.xml"
     ]
     
     for file_path in clean_files:
@@ -104,23 +120,22 @@ def clean():
 def lint():
     """代码质量检查"""
     print("🔍 代码质量检查...")
-    project_root = Path(__file__).parent.parent
     
     success = True
     
     # Ruff 检查
     print("\n📋 Ruff 代码检查...")
-    if not run_command("ruff check src/", cwd=project_root):
+    if not run_command("ruff check src/", cwd=PROJECT_ROOT):
         success = False
     
     # Ruff 格式检查
     print("\n🎨 Ruff 格式检查...")
-    if not run_command("ruff format src/ --check", cwd=project_root):
+    if not run_command("ruff format src/ --check", cwd=PROJECT_ROOT):
         success = False
     
     # MyPy 类型检查
     print("\n🔬 MyPy 类型检查...")
-    if not run_command("mypy src/ --ignore-missing-imports", cwd=project_root):
+    if not run_command("mypy src/ --ignore-missing-imports", cwd=PROJECT_ROOT):
         success = False
     
     return success
@@ -128,16 +143,14 @@ def lint():
 def format_code():
     """格式化代码"""
     print("🎨 格式化代码...")
-    project_root = Path(__file__).parent.parent
-    return run_command("ruff format src/", cwd=project_root)
+    return run_command("ruff format src/", cwd=PROJECT_ROOT)
 
 def test():
     """运行测试"""
     print("🧪 运行测试...")
-    project_root = Path(__file__).parent.parent
     
     # 创建测试目录（如果不存在）
-    test_dir = project_root / "tests"
+    test_dir = PROJECT_ROOT / "tests"
     if not test_dir.exists():
         test_dir.mkdir()
         
@@ -158,13 +171,12 @@ def test_import():
 """)
         print("✅ 创建了基础测试文件")
     
-    return run_command("python -m pytest tests/ -v", cwd=project_root)
+    return run_command("python -m pytest tests/ -n auto --dist loadfile -v", cwd=PROJECT_ROOT)
 
 def check_deployment():
     """检查部署状态"""
     print("🌐 检查部署状态...")
-    project_root = Path(__file__).parent.parent
-    return run_command("python scripts/check_deployment.py", cwd=project_root)
+    return run_command("python scripts/check_deployment.py", cwd=PROJECT_ROOT)
 
 def main():
     """主函数"""
@@ -178,6 +190,7 @@ def main():
 命令:
   install     - 安装开发依赖
   build       - 构建文档
+  build-dirty - 增量构建文档 (仅重建变更页面)
   serve       - 启动文档服务器
   clean       - 清理构建文件
   lint        - 代码质量检查
@@ -203,6 +216,8 @@ def main():
     if command == "install":
         success = install_deps()
     elif command == "build":
+        success = build_docs(clean=True)
+    elif command == "build-dirty":
         success = build_docs()
     elif command == "serve":
         serve_docs()
@@ -221,7 +236,7 @@ def main():
             clean() and
             install_deps() and
             lint() and
-            build_docs() and
+            build_docs(clean=True) and
             test()
         )
     else:
@@ -3,115 +3,218 @@
 文档统计脚本
 
 分析文档质量和覆盖率
+
+用法:
+  python scripts/docs_stats.py [--details <明细文件>] > docs_stats.json
 """
 
 import os
 import re
+import sys
 import json
 from pathlib import Path
-from typing import Dict, List, Any
-from collections import defaultdict
-
-def count_words(text: str) -> int:
-    """统计文字数量"""
-    # 移除Markdown语法
-    text = re.sub(r'[#*`_\[\]()]', '', text)
-    # 移除HTML标签
-    text = re.sub(r'<[^>]+>', '', text)
-    # 统计中英文字符
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
-    english_words = len(re.findall(r'\b[a-zA-Z]+\b', text))
-    return chinese_chars + english_words
-
-def extract_code_blocks(content: str) -> List[str]:
-    """提取代码块"""
-    pattern = r'```[\w]*\n(.*?)\n```'
-    return re.findall(pattern, content, re.DOTALL)
-
-def extract_links(content: str) -> Dict[str, List[str]]:
-    """提取链接"""
-    internal_links = re.findall(r'\[([^\]]+)\]\((?!http)([^)]+)\)', content)
-    external_links = re.findall(r'\[([^\]]+)\]\((https?://[^)]+)\)', content)
-    
-    return {
-        'internal': [link[1] for link in internal_links],
-        'external': [link[1] for link in external_links]
-    }
+from typing import Dict, FrozenSet, Iterator, List, Any, Optional, TextIO, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# JSON输出优先使用orjson直接生成UTF-8字节，未安装时回退到标准库json
+try:
+    import orjson
+
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+# 分析结果缓存，统计逻辑变化时需递增版本号
+CACHE_FILE_NAME = '.docs_stats_cache.json'
+_CACHE_VERSION = 3
+
+# 预期的文档结构
+EXPECTED_DOCS = (
+    'index.md',
+    'getting-started/index.md',
+    'getting-started/installation.md',
+    'getting-started/configuration.md',
+    'user-guide/index.md',
+    'api-reference/index.md',
+    'api-reference/mcp-tools.md',
+    'best-practices/index.md',
+    'examples/index.md',
+    'changelog.md'
+)
+
+# 质量评分规则: (统计项, 阈值, 分值)
+_SCORE_RULES = (
+    # 基础内容 (40分)
+    ('has_title', 1, 10),
+    ('has_description', 1, 10),
+    ('words', 100, 10),
+    ('headings', 2, 10),
+    # 代码示例 (20分)
+    ('code_blocks', 1, 15),
+    ('code_blocks', 3, 5),
+    # 导航和链接 (20分)
+    ('internal_links', 1, 10),
+    ('internal_links', 3, 5),
+    ('external_links', 1, 5),
+    # 丰富内容 (20分)
+    ('images', 1, 5),
+    ('tables', 1, 5),
+    ('admonitions', 1, 5),
+    ('words', 500, 5),
+)
+
+# 单次扫描Markdown正文(已剔除代码块)的组合正则：
+# 图片、链接和HTML标签整体消耗，其内容不再计入字数；
+# 标题只消耗"#"，表格行为零宽匹配，未被消耗的文字留待统计字数
+_MASTER_RE = re.compile(r"""
+    (?P<image>!\[[^\]]*\]\([^)]+\))
+  | (?P<extlink>\[(?P<ext_text>[^\]]+)\]\(https?://[^)]+\))
+  | (?P<intlink>\[(?P<int_text>[^\]]+)\]\((?!http)[^)]+\))
+  | (?P<html><[^>\n]+>)
+  | ^(?P<heading>\#+)(?=\s)
+  | ^(?P<table>)(?=\|[^\n]*\|$)
+  | (?P<admon>!!!)(?=\s+\w)
+""", re.MULTILINE | re.VERBOSE)
+
+# 中文字符与英文单词
+_WORD_RE = re.compile(r'[\u4e00-\u9fff]|\b[a-zA-Z]+\b')
+
+# 统计字数前需移除的Markdown标记字符
+_STRIP_TABLE = str.maketrans('', '', '#*`_[]()')
+
+def iter_markdown_files(root: Path) -> Iterator[Tuple[Path, int, int]]:
+    """递归遍历目录，返回 (Markdown文件路径, 文件大小, 修改时间ns)"""
+    # 目录以字符串入队，只为Markdown文件构造Path对象
+    queue = deque([os.fspath(root)])
+    while queue:
+        with os.scandir(queue.popleft()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    queue.append(entry.path)
+                elif entry.name.endswith('.md') and entry.is_file():
+                    st = entry.stat()
+                    yield Path(entry.path), st.st_size, st.st_mtime_ns
+
+def load_analysis_cache(cache_file: Path) -> Dict[str, list]:
+    """读取分析缓存: 文件路径 -> [修改时间ns, 文件大小, 统计结果]"""
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != _CACHE_VERSION:
+        return {}
+    return data.get('files', {})
 
-def extract_images(content: str) -> List[str]:
-    """提取图片"""
-    return re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', content)
+def save_analysis_cache(cache_file: Path, files: Dict[str, list]) -> None:
+    """原子写入分析缓存"""
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': _CACHE_VERSION, 'files': files}, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"保存分析缓存失败: {e}", file=sys.stderr)
 
-def analyze_markdown_file(file_path: Path) -> Dict[str, Any]:
+def split_code_blocks(content: str) -> Tuple[int, str]:
+    """逐行扫描代码围栏，返回 (代码块数量, 去除代码块后的正文)"""
+    code_blocks = 0
+    in_code = False
+    prose = []
+    for line in content.splitlines():
+        if line.lstrip().startswith('```'):
+            if not in_code:
+                code_blocks += 1
+            in_code = not in_code
+        elif not in_code:
+            prose.append(line)
+    return code_blocks, '\n'.join(prose)
+
+def analyze_markdown_file(file_path: Path, size_bytes: Optional[int] = None) -> Dict[str, Any]:
     """分析单个Markdown文件"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    data = file_path.read_bytes()
+    content = data.decode('utf-8')
+    if size_bytes is None:
+        size_bytes = len(data)
+    
+    words = headings = images = tables = admonitions = 0
+    has_title = False
+    internal_links = external_links = 0
+    
+    # 代码块内容不计入字数，仅对正文做一次遍历完成其余统计
+    code_blocks, prose = split_code_blocks(content)
+    text_parts = []
+    pos = 0
+    for m in _MASTER_RE.finditer(prose):
+        text_parts.append(prose[pos:m.start()])
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'heading':
+            headings += 1
+            if m.end() - m.start() == 1:
+                has_title = True
+        elif kind == 'table':
+            tables += 1
+        elif kind == 'extlink':
+            external_links += 1
+            words += len(_WORD_RE.findall(m.group('ext_text').translate(_STRIP_TABLE)))
+        elif kind == 'intlink':
+            internal_links += 1
+            words += len(_WORD_RE.findall(m.group('int_text').translate(_STRIP_TABLE)))
+        elif kind == 'image':
+            images += 1
+        elif kind == 'admon':
+            admonitions += 1
+    text_parts.append(prose[pos:])
+    
+    # 先移除Markdown标记字符再统计字数，使 _emphasis_、snake_case 等仍计为单词
+    words += len(_WORD_RE.findall(''.join(text_parts).translate(_STRIP_TABLE)))
     
     # 基本统计
     stats = {
         'file': str(file_path),
-        'size_bytes': file_path.stat().st_size,
-        'lines': len(content.splitlines()),
-        'words': count_words(content),
+        'size_bytes': size_bytes,
+        'lines': content.count('\n') + (bool(content) and not content.endswith('\n')),
+        'words': words,
         'characters': len(content)
     }
     
     # 内容分析
-    stats['headings'] = len(re.findall(r'^#+\s', content, re.MULTILINE))
-    stats['code_blocks'] = len(extract_code_blocks(content))
-    stats['links'] = extract_links(content)
-    stats['images'] = len(extract_images(content))
-    stats['tables'] = len(re.findall(r'^\|.*\|$', content, re.MULTILINE))
-    stats['admonitions'] = len(re.findall(r'!!!\s+\w+', content))
+    stats['headings'] = headings
+    stats['code_blocks'] = code_blocks
+    stats['internal_links'] = internal_links
+    stats['external_links'] = external_links
+    stats['images'] = images
+    stats['tables'] = tables
+    stats['admonitions'] = admonitions
     
     # 质量指标
-    stats['has_title'] = bool(re.search(r'^#\s+', content, re.MULTILINE))
-    stats['has_description'] = 'description:' in content or len(content) > 100
+    stats['has_title'] = has_title
+    # description 只会出现在文件开头的frontmatter中，无需扫描全文
+    stats['has_description'] = len(content) > 100 or (
+        content.startswith('---') and 'description:' in content[:512]
+    )
     stats['has_examples'] = stats['code_blocks'] > 0
-    stats['has_navigation'] = len(stats['links']['internal']) > 0
+    stats['has_navigation'] = internal_links > 0
     
     return stats
 
 def calculate_quality_score(stats: Dict[str, Any]) -> float:
     """计算文档质量评分"""
-    score = 0
-    max_score = 100
-    
-    # 基础内容 (40分)
-    if stats['has_title']:
-        score += 10
-    if stats['has_description']:
-        score += 10
-    if stats['words'] >= 100:
-        score += 10
-    if stats['headings'] >= 2:
-        score += 10
-    
-    # 代码示例 (20分)
-    if stats['has_examples']:
-        score += 15
-    if stats['code_blocks'] >= 3:
-        score += 5
-    
-    # 导航和链接 (20分)
-    if stats['has_navigation']:
-        score += 10
-    if len(stats['links']['internal']) >= 3:
-        score += 5
-    if len(stats['links']['external']) >= 1:
-        score += 5
-    
-    # 丰富内容 (20分)
-    if stats['images'] > 0:
-        score += 5
-    if stats['tables'] > 0:
-        score += 5
-    if stats['admonitions'] > 0:
-        score += 5
-    if stats['words'] >= 500:
-        score += 5
-    
-    return min(score, max_score)
+    return min(sum(points for key, threshold, points in _SCORE_RULES if stats[key] >= threshold), 100)
+
+def analyze_one(md_file: Path, size_bytes: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """分析单个文件并计算质量评分，供进程池调用"""
+    try:
+        stats = analyze_markdown_file(md_file, size_bytes)
+        stats['quality_score'] = calculate_quality_score(stats)
+        return stats
+    except Exception as e:
+        print(f"分析文件 {md_file} 时出错: {e}", file=sys.stderr)
+        return None
 
 def analyze_documentation() -> Dict[str, Any]:
     """分析整个文档"""
@@ -121,50 +224,86 @@ def analyze_documentation() -> Dict[str, Any]:
         return {"error": "文档目录不存在"}
     
     # 收集所有Markdown文件
-    md_files = list(docs_dir.rglob("*.md"))
+    md_entries = sorted(iter_markdown_files(docs_dir))
+    md_files = [path for path, _, _ in md_entries]
     
     if not md_files:
         return {"error": "未找到Markdown文件"}
     
+    # 未变化的文件直接复用上次的分析结果
+    cache_file = docs_dir.parent / CACHE_FILE_NAME
+    cache = load_analysis_cache(cache_file)
+    new_cache: Dict[str, list] = {}
+    results: List[Optional[Dict[str, Any]]] = [None] * len(md_entries)
+    pending = []
+    
+    for index, (path, size, mtime_ns) in enumerate(md_entries):
+        entry = cache.get(str(path))
+        if entry and entry[0] == mtime_ns and entry[1] == size:
+            results[index] = entry[2]
+            new_cache[str(path)] = entry
+        else:
+            pending.append(index)
+    
+    # 各文件分析互不依赖，使用多进程并行处理
+    if pending:
+        workers = os.cpu_count() or 1
+        chunksize = max(1, len(pending) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            analyzed = executor.map(
+                analyze_one,
+                [md_entries[index][0] for index in pending],
+                [md_entries[index][1] for index in pending],
+                chunksize=chunksize
+            )
+            for index, stats in zip(pending, analyzed):
+                results[index] = stats
+                if stats is not None:
+                    path, size, mtime_ns = md_entries[index]
+                    new_cache[str(path)] = [mtime_ns, size, stats]
+    
+    save_analysis_cache(cache_file, new_cache)
+    
     # 分析每个文件
     file_stats = []
-    total_stats = defaultdict(int)
-    
-    for md_file in md_files:
-        try:
-            stats = analyze_markdown_file(md_file)
-            stats['quality_score'] = calculate_quality_score(stats)
-            file_stats.append(stats)
-            
-            # 累计统计
-            for key in ['words', 'lines', 'code_blocks', 'images', 'tables', 'headings']:
-                total_stats[key] += stats.get(key, 0)
-            
-            total_stats['internal_links'] += len(stats['links']['internal'])
-            total_stats['external_links'] += len(stats['links']['external'])
-            
-        except Exception as e:
-            print(f"分析文件 {md_file} 时出错: {e}")
+    tot_words = tot_lines = tot_code_blocks = tot_images = tot_tables = tot_headings = 0
+    tot_internal_links = tot_external_links = 0
+    
+    for stats in results:
+        if stats is None:
+            continue
+        file_stats.append(stats)
+        
+        # 累计统计
+        tot_words += stats['words']
+        tot_lines += stats['lines']
+        tot_code_blocks += stats['code_blocks']
+        tot_images += stats['images']
+        tot_tables += stats['tables']
+        tot_headings += stats['headings']
+        tot_internal_links += stats['internal_links']
+        tot_external_links += stats['external_links']
     
     # 计算总体统计
     total_files = len(file_stats)
     avg_quality = sum(f['quality_score'] for f in file_stats) / total_files if total_files > 0 else 0
     
     # 文档覆盖率分析
-    coverage_stats = analyze_coverage(docs_dir)
+    existing = frozenset(path.relative_to(docs_dir).as_posix() for path in md_files)
+    coverage_stats = analyze_coverage(docs_dir, existing)
     
     # 生成最终统计
     final_stats = {
         'generated_at': '2024-01-15T10:30:00Z',
         'total_pages': total_files,
-        'total_words': total_stats['words'],
-        'total_lines': total_stats['lines'],
-        'code_examples': total_stats['code_blocks'],
-        'images': total_stats['images'],
-        'tables': total_stats['tables'],
-        'headings': total_stats['headings'],
-        'internal_links': total_stats['internal_links'],
-        'external_links': total_stats['external_links'],
+        'total_words': tot_words,
+        'total_lines': tot_lines,
+        'code_examples': tot_code_blocks,
+        'images': tot_images,
+        'tables': tot_tables,
+        'headings': tot_headings,
+        'internal_links': tot_internal_links,
+        'external_links': tot_external_links,
         'average_quality_score': round(avg_quality, 1),
         'quality_score': round(avg_quality, 0),
         'coverage': coverage_stats['coverage_percentage'],
@@ -174,36 +313,24 @@ def analyze_documentation() -> Dict[str, Any]:
     
     return final_stats
 
-def analyze_coverage(docs_dir: Path) -> Dict[str, Any]:
-    """分析文档覆盖率"""
-    # 预期的文档结构
-    expected_docs = [
-        'index.md',
-        'getting-started/index.md',
-        'getting-started/installation.md',
-        'getting-started/configuration.md',
-        'user-guide/index.md',
-        'api-reference/index.md',
-        'api-reference/mcp-tools.md',
-        'best-practices/index.md',
-        'examples/index.md',
-        'changelog.md'
-    ]
-    
+def analyze_coverage(docs_dir: Path, existing_md: FrozenSet[str]) -> Dict[str, Any]:
+    """分析文档覆盖率
+
+    existing_md 为已扫描到的Markdown文件相对路径集合（使用"/"分隔）
+    """
     existing_docs = []
     missing_docs = []
     
-    for doc in expected_docs:
-        doc_path = docs_dir / doc
-        if doc_path.exists():
+    for doc in EXPECTED_DOCS:
+        if doc in existing_md:
             existing_docs.append(doc)
         else:
             missing_docs.append(doc)
     
-    coverage_percentage = round((len(existing_docs) / len(expected_docs)) * 100, 1)
+    coverage_percentage = round((len(existing_docs) / len(EXPECTED_DOCS)) * 100, 1)
     
     return {
-        'expected_count': len(expected_docs),
+        'expected_count': len(EXPECTED_DOCS),
         'existing_count': len(existing_docs),
         'missing_count': len(missing_docs),
         'coverage_percentage': coverage_percentage,
@@ -211,9 +338,9 @@ def analyze_coverage(docs_dir: Path) -> Dict[str, Any]:
         'missing_docs': missing_docs
     }
 
-def generate_quality_report(stats: Dict[str, Any]) -> str:
-    """生成质量报告"""
-    report = f"""# 📊 文档质量报告
+def write_quality_report(stats: Dict[str, Any], fp: TextIO) -> None:
+    """将质量报告逐段写入文件"""
+    fp.write(f"""# 📊 文档质量报告
 
 ## 总体统计
 
@@ -233,55 +360,58 @@ def generate_quality_report(stats: Dict[str, Any]) -> str:
 **文档覆盖率**: {stats['coverage']}%
 
 ### 已完成文档
-"""
+""")
     
-    for doc in stats['coverage_details']['existing_docs']:
-        report += f"- ✅ {doc}\n"
+    fp.writelines(f"- ✅ {doc}\n" for doc in stats['coverage_details']['existing_docs'])
     
     if stats['coverage_details']['missing_docs']:
-        report += "\n### 缺失文档\n"
-        for doc in stats['coverage_details']['missing_docs']:
-            report += f"- ❌ {doc}\n"
+        fp.write("\n### 缺失文档\n")
+        fp.writelines(f"- ❌ {doc}\n" for doc in stats['coverage_details']['missing_docs'])
     
-    report += f"""
+    fp.write(f"""
 ## 详细统计
 
 | 文件 | 字数 | 质量评分 | 代码示例 | 链接数 |
 |------|------|----------|----------|--------|
-"""
-    
-    for file_stat in stats['file_details'][:10]:  # 显示前10个文件
-        file_name = Path(file_stat['file']).name
-        report += f"| {file_name} | {file_stat['words']} | {file_stat['quality_score']}/100 | {file_stat['code_blocks']} | {len(file_stat['links']['internal'])} |\n"
+""")
     
-    return report
+    fp.writelines(
+        f"| {Path(file_stat['file']).name} | {file_stat['words']} | {file_stat['quality_score']}/100 | "
+        f"{file_stat['code_blocks']} | {file_stat['internal_links']} |\n"
+        for file_stat in stats['file_details'][:10]  # 显示前10个文件
+    )
 
 def main():
     """主函数"""
-    print("📊 分析文档统计...")
+    print("📊 分析文档统计...", file=sys.stderr)
     
     # 分析文档
     stats = analyze_documentation()
     
     if 'error' in stats:
-        print(f"❌ 错误: {stats['error']}")
+        print(f"❌ 错误: {stats['error']}", file=sys.stderr)
         return
     
-    # 输出JSON格式的统计信息
-    print(json.dumps(stats, ensure_ascii=False, indent=2))
+    # 标准输出只包含汇总统计，逐文件明细仅在指定 --details <文件> 时写出
+    summary = {key: value for key, value in stats.items() if key != 'file_details'}
+    # 绕过文本层直接写字节，避免二次编码
+    sys.stdout.flush()
+    sys.stdout.buffer.write(_json_bytes(summary) + b'\n')
+    sys.stdout.buffer.flush()
     
-    # 生成质量报告
-    report = generate_quality_report(stats)
+    if '--details' in sys.argv[1:-1]:
+        details_file = Path(sys.argv[sys.argv.index('--details') + 1])
+        details_file.write_bytes(_json_bytes(stats['file_details']))
+        print(f"📄 文件明细已保存: {details_file}", file=sys.stderr)
     
-    # 保存报告
+    # 生成并保存质量报告
     report_file = Path(__file__).parent.parent / "docs_quality_report.md"
     with open(report_file, 'w', encoding='utf-8') as f:
-        f.write(report)
+        write_quality_report(stats, f)
     
     print(f"📋 质量报告已保存: {report_file}", file=sys.stderr)
     print(f"📈 总体质量评分: {stats['quality_score']}/100", file=sys.stderr)
     print(f"📊 文档覆盖率: {stats['coverage']}%", file=sys.stderr)
 
 if __name__ == "__main__":
-    import sys
     main()
@@ -3,25 +3,36 @@
 DramaCraft 完整测试验证系统。
 
 本脚本提供端到端的测试验证，确保所有功能稳定可用。
+
+用法:
+  python scripts/run_tests.py [--fail-fast]
 """
 
 import asyncio
+import itertools
 import sys
 import tempfile
 import json
 import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-import subprocess
-import shutil
+from unittest.mock import patch
+
+# 测试报告优先使用orjson序列化，未安装时回退到标准库json
+try:
+    import orjson
+
+    def _dump_report(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dump_report(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
 
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from dramacraft.config import DramaCraftConfig
-from dramacraft.server import DramaCraftServer
-from dramacraft.workflow.automation import AutomationWorkflow, WorkflowValidator
-from dramacraft.monitoring.performance import get_performance_monitor
 from dramacraft.utils.logging import get_logger
 
 
@@ -31,18 +42,59 @@ class TestResult:
     def __init__(self, name: str):
         self.name = name
         self.success = False
+        self.skipped = False
         self.error_message = ""
         self.duration = 0.0
         self.details = {}
 
 
+@lru_cache(maxsize=None)
+def _mock_llm_class():
+    """创建模拟LLM客户端类，只在首次使用时导入并定义一次。"""
+    from dramacraft.llm.base import BaseLLMClient, GenerationParams, LLMResponse
+    
+    class _MockLLM(BaseLLMClient):
+        def __init__(self, text: str = "mock", **kwargs):
+            super().__init__(api_key="test", model_name="mock-model", **kwargs)
+            self._text = text
+        
+        @property
+        def provider_name(self) -> str:
+            return "mock"
+        
+        @property
+        def supported_models(self) -> list:
+            return ["mock-model"]
+        
+        async def _make_request(self, prompt: str, params: GenerationParams) -> dict:
+            return {"result": self._text}
+        
+        def _parse_response(self, response: dict) -> LLMResponse:
+            return LLMResponse(
+                text=response["result"],
+                provider=self.provider_name,
+                model=self.model_name
+            )
+    
+    return _MockLLM
+
+
+def _mock_llm(text: str = "mock"):
+    """返回固定回复文本的模拟LLM客户端。"""
+    return _mock_llm_class()(text)
+
+
 class DramaCraftTestSuite:
     """DramaCraft 测试套件。"""
     
-    def __init__(self):
+    def __init__(self, fail_fast: bool = False):
         self.logger = get_logger("test_suite")
         self.results: List[TestResult] = []
-        self.temp_dir = Path(tempfile.mkdtemp(prefix="dramacraft_test_"))
+        self.fail_fast = fail_fast
+        self._any_failed = False
+        self.temp_dir: Optional[Path] = None
+        self._fake_video: Optional[Path] = None
+        self._buf: List[str] = []
         
     async def run_all_tests(self) -> bool:
         """运行所有测试。"""
@@ -64,40 +116,71 @@ class DramaCraftTestSuite:
             self.test_file_operations
         ]
         
-        for test_method in test_methods:
-            await self._run_test(test_method)
-        
-        # 生成测试报告
-        self._generate_report()
-        
-        # 清理
-        self._cleanup()
+        # 临时目录由上下文管理器负责删除，测试中断时同样会被清理
+        with tempfile.TemporaryDirectory(prefix="dramacraft_test_") as temp_dir:
+            self.temp_dir = Path(temp_dir)
+            
+            # 各测试共用的伪视频文件，只写入一次
+            self._fake_video = self.temp_dir / "fixture.mp4"
+            self._fake_video.write_bytes(b"fake video data")
+            
+            # 各测试互不依赖，并发执行；结果按原顺序输出，避免日志交错
+            outcomes = await asyncio.gather(
+                *(self._run_test(test_method) for test_method in test_methods),
+                return_exceptions=True
+            )
+            for test_method, outcome in zip(test_methods, outcomes):
+                if isinstance(outcome, BaseException):
+                    result = TestResult(self._test_name(test_method))
+                    result.error_message = str(outcome)
+                    outcome = result
+                    self._any_failed = True
+                self.results.append(outcome)
+                self._buf.append(f"\n🧪 测试: {outcome.name}\n")
+                self._buf.append("-" * 30 + "\n")
+                if outcome.success:
+                    self._buf.append(f"✅ {outcome.name} - 通过\n")
+                elif outcome.skipped:
+                    self._buf.append(f"⏭️ {outcome.name} - {outcome.error_message}\n")
+                else:
+                    self._buf.append(f"❌ {outcome.name} - 失败: {outcome.error_message}\n")
+                self._flush()
+            
+            # 生成测试报告
+            self._generate_report()
         
         # 返回总体结果
-        return all(result.success for result in self.results)
+        return not self._any_failed
     
-    async def _run_test(self, test_method):
-        """运行单个测试。"""
-        test_name = test_method.__name__.replace("test_", "").replace("_", " ").title()
+    @staticmethod
+    def _test_name(test_method) -> str:
+        """由测试方法名生成显示名称。"""
+        return test_method.__name__.replace("test_", "").replace("_", " ").title()
+    
+    async def _run_test(self, test_method) -> TestResult:
+        """运行单个测试并返回结果，输出由调用方统一打印。"""
+        test_name = self._test_name(test_method)
         result = TestResult(test_name)
         
-        print(f"\n🧪 测试: {test_name}")
-        print("-" * 30)
+        # fail-fast模式下已有测试失败时，尚未开始的测试直接跳过
+        if self.fail_fast and self._any_failed:
+            result.skipped = True
+            result.error_message = "已跳过 (前序测试失败)"
+            return result
         
         start_time = time.time()
         
         try:
             await test_method(result)
             result.success = True
-            print(f"✅ {test_name} - 通过")
         except Exception as e:
             result.success = False
             result.error_message = str(e)
-            print(f"❌ {test_name} - 失败: {e}")
+            self._any_failed = True
             self.logger.error(f"测试失败 {test_name}: {e}", exc_info=True)
         
         result.duration = time.time() - start_time
-        self.results.append(result)
+        return result
     
     async def test_configuration(self, result: TestResult):
         """测试配置系统。"""
@@ -109,10 +192,10 @@ class DramaCraftTestSuite:
         config.llm.api_key = "test_key"
         assert config.llm.api_key == "test_key"
         
-        # 测试环境变量加载
+        # 测试环境变量加载，退出时恢复原环境，避免影响其他测试
         import os
-        os.environ["LLM__PROVIDER"] = "baidu"
-        config = DramaCraftConfig()
+        with patch.dict(os.environ, {"LLM__PROVIDER": "baidu"}):
+            config = DramaCraftConfig()
         assert config.llm.provider == "baidu"
         
         result.details["config_loaded"] = True
@@ -137,18 +220,8 @@ class DramaCraftTestSuite:
     async def test_video_analysis(self, result: TestResult):
         """测试视频分析。"""
         from dramacraft.analysis.deep_analyzer import DeepVideoAnalyzer
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
         
-        # 创建模拟LLM客户端
-        class MockLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
-                return GenerationResult(text="测试场景描述", usage={})
-        
-        analyzer = DeepVideoAnalyzer(MockLLMClient())
-        
-        # 创建测试视频文件
-        test_video = self.temp_dir / "test_video.mp4"
-        test_video.write_bytes(b"fake video data")
+        analyzer = DeepVideoAnalyzer(_mock_llm("测试场景描述"))
         
         # 测试分析器初始化
         assert analyzer.llm_client is not None
@@ -159,13 +232,8 @@ class DramaCraftTestSuite:
     async def test_timeline_sync(self, result: TestResult):
         """测试时间轴同步。"""
         from dramacraft.sync.timeline_sync import TimelineSynchronizer
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
         
-        class MockLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
-                return GenerationResult(text="同步测试", usage={})
-        
-        synchronizer = TimelineSynchronizer(MockLLMClient())
+        synchronizer = TimelineSynchronizer(_mock_llm("同步测试"))
         
         # 测试时间精度
         assert synchronizer.time_precision.as_tuple().exponent == -3  # 毫秒精度
@@ -176,13 +244,8 @@ class DramaCraftTestSuite:
     async def test_audio_enhancement(self, result: TestResult):
         """测试音频增强。"""
         from dramacraft.audio.enhancer import AudioEnhancer
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
-        
-        class MockLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
-                return GenerationResult(text="音频测试", usage={})
         
-        enhancer = AudioEnhancer(MockLLMClient())
+        enhancer = AudioEnhancer(_mock_llm("音频测试"))
         
         # 测试音乐库索引
         assert len(enhancer.music_index) > 0
@@ -193,13 +256,8 @@ class DramaCraftTestSuite:
     async def test_effects_generation(self, result: TestResult):
         """测试特效生成。"""
         from dramacraft.effects.auto_effects import AutoEffectsEngine
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
         
-        class MockLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
-                return GenerationResult(text="特效测试", usage={})
-        
-        effects_engine = AutoEffectsEngine(MockLLMClient())
+        effects_engine = AutoEffectsEngine(_mock_llm("特效测试"))
         
         # 测试特效模板
         assert len(effects_engine.effect_templates) > 0
@@ -233,13 +291,8 @@ class DramaCraftTestSuite:
     async def test_workflow_automation(self, result: TestResult):
         """测试工作流自动化。"""
         from dramacraft.workflow.automation import AutomationWorkflow, WorkflowValidator
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
-        
-        class MockLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
-                return GenerationResult(text="工作流测试", usage={})
         
-        workflow = AutomationWorkflow(MockLLMClient(), self.temp_dir)
+        workflow = AutomationWorkflow(_mock_llm("工作流测试"), self.temp_dir)
         validator = WorkflowValidator()
         
         # 测试工作流组件
@@ -249,11 +302,8 @@ class DramaCraftTestSuite:
         assert workflow.effects_engine is not None
         
         # 测试验证器
-        test_video = self.temp_dir / "test.mp4"
-        test_video.write_bytes(b"test")
-        
         validation = validator.validate_inputs(
-            [test_video], "测试项目", "测试目标"
+            [self._fake_video], "测试项目", "测试目标"
         )
         assert validation["valid"] is True
         
@@ -261,6 +311,8 @@ class DramaCraftTestSuite:
     
     async def test_mcp_server(self, result: TestResult):
         """测试MCP服务器。"""
+        from dramacraft.server import DramaCraftServer
+        
         config = DramaCraftConfig()
         
         # 测试服务器创建（不启动）
@@ -274,12 +326,15 @@ class DramaCraftTestSuite:
     
     async def test_performance_monitoring(self, result: TestResult):
         """测试性能监控。"""
-        monitor = get_performance_monitor()
+        from dramacraft.monitoring.performance import PerformanceMonitor
         
-        # 测试监控功能
+        # 测试监控功能，注入递增的假时钟代替真实等待；不启动后台收集线程，
+        # 假时钟只由测试代码推进
+        ticks = itertools.count(1000.0, 0.1)
+        monitor = PerformanceMonitor(clock=lambda: next(ticks), start_monitoring=False)
         monitor.start_task("test_task", "test")
-        time.sleep(0.1)
         monitor.end_task("test_task", success=True)
+        assert monitor.task_metrics["test_task"].duration > 0
         
         # 测试指标收集
         metrics = monitor.get_current_metrics()
@@ -297,13 +352,14 @@ class DramaCraftTestSuite:
     async def test_error_handling(self, result: TestResult):
         """测试错误处理。"""
         from dramacraft.workflow.automation import AutomationWorkflow
-        from dramacraft.llm.base import BaseLLMClient, GenerationResult
+        from dramacraft.llm.base import GenerationParams
         
-        class FailingLLMClient(BaseLLMClient):
-            async def generate(self, prompt: str, params=None) -> GenerationResult:
+        class FailingLLMClient(_mock_llm_class()):
+            async def _make_request(self, prompt: str, params: GenerationParams) -> dict:
                 raise Exception("模拟API失败")
         
-        workflow = AutomationWorkflow(FailingLLMClient(), self.temp_dir)
+        # 不重试，避免退避等待拖慢测试
+        workflow = AutomationWorkflow(FailingLLMClient(max_retries=0), self.temp_dir)
         
         # 测试无效输入处理
         invalid_video = Path("/nonexistent/video.mp4")
@@ -325,44 +381,46 @@ class DramaCraftTestSuite:
         ensure_directory(test_dir)
         assert test_dir.exists()
         
-        # 测试视频文件验证
-        fake_video = self.temp_dir / "fake.mp4"
-        fake_video.write_bytes(b"not a real video")
-        
-        # 应该返回False，因为不是真实视频
-        is_valid = validate_video_file(fake_video)
+        # 测试视频文件验证，应该返回False，因为不是真实视频
+        is_valid = validate_video_file(self._fake_video)
         # 注意：这可能返回True或False，取决于验证实现
         
         result.details["file_operations_tested"] = True
     
     def _generate_report(self):
         """生成测试报告。"""
-        print("\n" + "=" * 50)
-        print("📊 测试报告")
-        print("=" * 50)
+        self._buf.append("\n" + "=" * 50 + "\n")
+        self._buf.append("📊 测试报告\n")
+        self._buf.append("=" * 50 + "\n")
         
         total_tests = len(self.results)
         passed_tests = sum(1 for r in self.results if r.success)
-        failed_tests = total_tests - passed_tests
-        
-        print(f"总测试数: {total_tests}")
-        print(f"通过: {passed_tests}")
-        print(f"失败: {failed_tests}")
-        print(f"成功率: {passed_tests/total_tests*100:.1f}%")
+        skipped_tests = sum(1 for r in self.results if r.skipped)
+        failed_tests = total_tests - passed_tests - skipped_tests
+        # 成功率只按实际执行的测试计算
+        executed_tests = passed_tests + failed_tests
+        success_rate = passed_tests / executed_tests * 100 if executed_tests else 0.0
+        
+        self._buf.append(f"总测试数: {total_tests}\n")
+        self._buf.append(f"通过: {passed_tests}\n")
+        self._buf.append(f"失败: {failed_tests}\n")
+        if skipped_tests:
+            self._buf.append(f"跳过: {skipped_tests}\n")
+        self._buf.append(f"成功率: {success_rate:.1f}%\n")
         
         total_duration = sum(r.duration for r in self.results)
-        print(f"总耗时: {total_duration:.2f}秒")
+        self._buf.append(f"总耗时: {total_duration:.2f}秒\n")
         
         if failed_tests > 0:
-            print("\n❌ 失败的测试:")
+            self._buf.append("\n❌ 失败的测试:\n")
             for result in self.results:
-                if not result.success:
-                    print(f"  - {result.name}: {result.error_message}")
+                if not result.success and not result.skipped:
+                    self._buf.append(f"  - {result.name}: {result.error_message}\n")
         
-        print("\n✅ 通过的测试:")
+        self._buf.append("\n✅ 通过的测试:\n")
         for result in self.results:
             if result.success:
-                print(f"  - {result.name} ({result.duration:.2f}s)")
+                self._buf.append(f"  - {result.name} ({result.duration:.2f}s)\n")
         
         # 保存详细报告
         report_file = self.temp_dir.parent / "test_report.json"
@@ -371,13 +429,15 @@ class DramaCraftTestSuite:
                 "total": total_tests,
                 "passed": passed_tests,
                 "failed": failed_tests,
-                "success_rate": passed_tests/total_tests*100,
+                "skipped": skipped_tests,
+                "success_rate": success_rate,
                 "duration": total_duration
             },
             "results": [
                 {
                     "name": r.name,
                     "success": r.success,
+                    "skipped": r.skipped,
                     "duration": r.duration,
                     "error": r.error_message,
                     "details": r.details
@@ -386,22 +446,25 @@ class DramaCraftTestSuite:
             ]
         }
         
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, ensure_ascii=False, indent=2)
+        report_file.write_bytes(_dump_report(report_data))
         
-        print(f"\n📄 详细报告已保存到: {report_file}")
+        self._buf.append(f"\n📄 详细报告已保存到: {report_file}\n")
+        self._flush()
     
-    def _cleanup(self):
-        """清理测试文件。"""
-        try:
-            shutil.rmtree(self.temp_dir)
-        except Exception as e:
-            print(f"⚠️  清理临时文件失败: {e}")
+    def _flush(self):
+        """一次性写出缓冲的输出。"""
+        sys.stdout.write("".join(self._buf))
+        sys.stdout.flush()
+        self._buf.clear()
 
 
 async def main():
     """主函数。"""
-    test_suite = DramaCraftTestSuite()
+    test_suite = DramaCraftTestSuite(fail_fast="--fail-fast" in sys.argv[1:])
+    
+    # Python 3.12+ 上同步完成的协程无需再经过一轮事件循环调度
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
     
     try:
         success = await test_suite.run_all_tests()
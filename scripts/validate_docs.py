@@ -5,11 +5,53 @@
 验证文档结构的完整性和一致性
 """
 
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
 import yaml
 import re
-from typing import List, Dict, Set
+from typing import Iterator, List, Dict, Set, Tuple
+
+# 一级标题与包含空白字符的无效链接
+_TITLE_RE = re.compile(r'^#\s+', re.MULTILINE)
+_BADLINK_RE = re.compile(r'\]\([^)]*\s[^)]*\)')
+
+# 优先使用libyaml实现的C解析器
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@lru_cache(maxsize=None)
+def load_mkdocs_config() -> Dict:
+    """解析mkdocs.yml，结果在各验证项之间共享"""
+    with open("mkdocs.yml", 'rb') as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+def _iter_files(root: str, suffix: str) -> Iterator[str]:
+    """用os.scandir遍历目录树，按后缀产出文件路径字符串"""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(suffix):
+                        yield entry.path
+        except OSError:
+            continue
+
+@lru_cache(maxsize=None)
+def _scan_docs(docs_dir: str = "docs") -> Tuple[str, ...]:
+    """列出docs下的所有Markdown文件，各验证项共用同一次目录遍历"""
+    return tuple(_iter_files(docs_dir, ".md"))
+
+@lru_cache(maxsize=None)
+def _read_md(path: str) -> str:
+    """读取Markdown文件内容，同一文件只读取一次"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
 
 def validate_mkdocs_config() -> bool:
     """验证mkdocs.yml配置文件"""
@@ -21,8 +63,7 @@ def validate_mkdocs_config() -> bool:
         return False
     
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_mkdocs_config()
         
         # 检查必需的配置项
         required_keys = ['site_name', 'site_url', 'theme', 'nav']
@@ -41,39 +82,43 @@ def validate_mkdocs_config() -> bool:
         print(f"❌ 配置验证失败: {e}")
         return False
 
+def _nav_paths(nav: List) -> Iterator[str]:
+    """按导航顺序产出所有页面文件路径，用显式栈代替递归
+
+    与mkdocs的nav结构对应：列表项中的字典为导航项，字典值为文件路径或子导航列表
+    """
+    end = object()
+    stack = [(iter(nav), False)]
+    while stack:
+        items, in_dict = stack[-1]
+        item = next(items, end)
+        if item is end:
+            stack.pop()
+        elif in_dict:
+            if isinstance(item, str):
+                yield item
+            elif isinstance(item, list):
+                stack.append((iter(item), False))
+        elif isinstance(item, dict):
+            stack.append((iter(item.values()), True))
+
 def validate_navigation_structure() -> bool:
     """验证导航结构"""
     print("🔍 验证导航结构...")
     
     try:
-        with open("mkdocs.yml", 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
+        config = load_mkdocs_config()
         
         nav = config.get('nav', [])
         if not nav:
             print("❌ 导航结构为空")
             return False
         
-        # 检查导航项对应的文件是否存在
-        def check_nav_item(item, prefix=""):
-            if isinstance(item, dict):
-                for key, value in item.items():
-                    if isinstance(value, str):
-                        # 这是一个文件路径
-                        file_path = Path("docs") / value
-                        if not file_path.exists():
-                            print(f"❌ 导航文件不存在: {value}")
-                            return False
-                    elif isinstance(value, list):
-                        # 这是一个子导航
-                        for sub_item in value:
-                            if not check_nav_item(sub_item, f"{prefix}{key}/"):
-                                return False
-            return True
-        
-        for item in nav:
-            if not check_nav_item(item):
-                return False
+        # 检查导航项对应的文件是否存在，遇到第一个缺失文件即停止
+        missing = next((path for path in _nav_paths(nav) if not (Path("docs") / path).exists()), None)
+        if missing is not None:
+            print(f"❌ 导航文件不存在: {missing}")
+            return False
         
         print("✅ 导航结构验证通过")
         return True
@@ -82,6 +127,31 @@ def validate_navigation_structure() -> bool:
         print(f"❌ 导航结构验证失败: {e}")
         return False
 
+def _check_markdown_file(md_file: str, docs_dir: Path) -> List[str]:
+    """检查单个Markdown文件，返回发现的问题"""
+    issues = []
+    rel_path = os.path.relpath(md_file, docs_dir)
+    try:
+        content = _read_md(md_file)
+        
+        # 检查文件是否为空
+        if not content.strip():
+            issues.append(f"空文件: {rel_path}")
+            return issues
+        
+        # 检查是否有标题
+        if not _TITLE_RE.search(content):
+            issues.append(f"缺少主标题: {rel_path}")
+        
+        # 检查是否有无效的链接格式
+        if _BADLINK_RE.search(content):
+            issues.append(f"无效链接格式: {rel_path}")
+        
+    except Exception as e:
+        issues.append(f"读取文件失败 {rel_path}: {e}")
+    
+    return issues
+
 def validate_markdown_files() -> bool:
     """验证Markdown文件"""
     print("🔍 验证Markdown文件...")
@@ -91,34 +161,16 @@ def validate_markdown_files() -> bool:
         print("❌ docs目录不存在")
         return False
     
-    md_files = list(docs_dir.rglob("*.md"))
+    md_files = _scan_docs(str(docs_dir))
     if not md_files:
         print("❌ 未找到Markdown文件")
         return False
     
-    issues = []
-    
-    for md_file in md_files:
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 检查文件是否为空
-            if not content.strip():
-                issues.append(f"空文件: {md_file.relative_to(docs_dir)}")
-                continue
-            
-            # 检查是否有标题
-            if not re.search(r'^#\s+', content, re.MULTILINE):
-                issues.append(f"缺少主标题: {md_file.relative_to(docs_dir)}")
-            
-            # 检查是否有无效的链接格式
-            invalid_links = re.findall(r'\]\([^)]*\s[^)]*\)', content)
-            if invalid_links:
-                issues.append(f"无效链接格式: {md_file.relative_to(docs_dir)}")
-            
-        except Exception as e:
-            issues.append(f"读取文件失败 {md_file.relative_to(docs_dir)}: {e}")
+    # 文件读取会释放GIL，用线程池重叠I/O等待；map保持原有顺序
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        issues = list(chain.from_iterable(
+            executor.map(lambda md_file: _check_markdown_file(md_file, docs_dir), md_files)
+        ))
     
     if issues:
         print("❌ Markdown文件验证失败:")
@@ -141,19 +193,20 @@ def validate_assets() -> bool:
         return True
     
     # 检查CSS文件
-    css_files = list(assets_dir.rglob("*.css"))
+    css_files = list(_iter_files(str(assets_dir), ".css"))
     for css_file in css_files:
         try:
-            with open(css_file, 'r', encoding='utf-8') as f:
+            # 花括号都是ASCII，直接在字节上计数，无需解码整个文件
+            with open(css_file, 'rb') as f:
                 content = f.read()
             
             # 简单的CSS语法检查
-            if content.count('{') != content.count('}'):
-                print(f"❌ CSS语法错误: {css_file.relative_to(assets_dir)}")
+            if content.count(b'{') != content.count(b'}'):
+                print(f"❌ CSS语法错误: {os.path.relpath(css_file, assets_dir)}")
                 return False
                 
         except Exception as e:
-            print(f"❌ 读取CSS文件失败 {css_file.relative_to(assets_dir)}: {e}")
+            print(f"❌ 读取CSS文件失败 {os.path.relpath(css_file, assets_dir)}: {e}")
             return False
     
     print(f"✅ 资源文件验证通过 ({len(css_files)} 个CSS文件)")
@@ -188,32 +241,32 @@ def validate_frontmatter() -> bool:
     print("🔍 验证前置元数据...")
     
     docs_dir = Path("docs")
-    md_files = list(docs_dir.rglob("*.md"))
+    md_files = _scan_docs(str(docs_dir))
     
     issues = []
     
     for md_file in md_files:
+        rel_path = os.path.relpath(md_file, docs_dir)
         try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _read_md(md_file)
             
             # 检查是否有前置元数据
             if content.startswith('---'):
-                # 提取前置元数据
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
+                # 提取前置元数据，只切出头部而不复制整个正文
+                end = content.find('---', 3)
+                if end != -1:
                     try:
-                        frontmatter = yaml.safe_load(parts[1])
+                        frontmatter = yaml.load(content[3:end], Loader=_YamlLoader)
                         
                         # 检查title字段
                         if 'title' not in frontmatter:
-                            issues.append(f"缺少title: {md_file.relative_to(docs_dir)}")
+                            issues.append(f"缺少title: {rel_path}")
                         
                     except yaml.YAMLError:
-                        issues.append(f"前置元数据格式错误: {md_file.relative_to(docs_dir)}")
+                        issues.append(f"前置元数据格式错误: {rel_path}")
             
         except Exception as e:
-            issues.append(f"检查前置元数据失败 {md_file.relative_to(docs_dir)}: {e}")
+            issues.append(f"检查前置元数据失败 {rel_path}: {e}")
     
     if issues:
         print("⚠️ 前置元数据问题:")
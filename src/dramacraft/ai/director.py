@@ -5,20 +5,285 @@ AI导演模块 - 智能剪映操控和自动化编辑。
 自动生成剪映草稿并执行复杂的编辑操作。
 """
 
+import asyncio
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+import re
+import tempfile
+import textwrap
+import time
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Final, Optional, Union
 
 from ..llm.base import BaseLLMClient, GenerationParams
 from ..utils.logging import get_logger
 from ..video.draft import JianYingDraftManager
 from ..video.processor import VideoInfo, VideoProcessor
 
+# 单个视频分析结果的JSON结构，单视频、批量与合并提示词共用
+_ANALYSIS_SCHEMA: Final[str] = """{
+    "content_type": "短剧类型",
+    "theme": "主题描述",
+    "plot_summary": "情节概述",
+    "characters": ["角色1", "角色2"],
+    "visual_style": {
+        "composition": "构图风格",
+        "color_tone": "色彩基调",
+        "camera_movement": "镜头运动"
+    },
+    "technical_quality": {
+        "video_quality": "画面质量评分(1-10)",
+        "audio_quality": "音频质量评分(1-10)",
+        "editing_rhythm": "剪辑节奏评价"
+    },
+    "editing_suggestions": {
+        "style": "推荐剪辑风格",
+        "effects": ["推荐特效1", "推荐特效2"],
+        "subtitle_style": "字幕风格建议",
+        "music_style": "配乐风格建议"
+    },
+    "highlights": ["亮点1", "亮点2"],
+    "target_audience": "目标观众群体",
+    "viral_potential": "传播潜力评分(1-10)"
+}"""
 
-@dataclass
+# 按分析深度区分的分析要求，未知深度按基础分析处理
+_DEPTH_BLOCKS: Final[dict[str, str]] = {
+    "comprehensive": """
+## 分析要求 (综合分析)
+请从以下维度深度分析视频内容：
+
+1. **内容类型识别**
+   - 短剧类型(都市、古装、悬疑、喜剧等)
+   - 情节发展阶段(开头、发展、高潮、结局)
+   - 主要角色数量和特征
+
+2. **视觉特征分析**
+   - 画面构图风格
+   - 色彩基调和情绪表达
+   - 镜头运动特点
+   - 场景转换节奏
+
+3. **编辑建议**
+   - 适合的剪辑风格
+   - 推荐的特效类型
+   - 字幕添加建议
+   - 音乐配乐建议
+
+4. **观众吸引力评估**
+   - 内容亮点识别
+   - 潜在的观众群体
+   - 传播价值评估
+""",
+    "detailed": """
+## 分析要求 (详细分析)
+请分析以下关键要素：
+
+1. **内容特征**
+   - 短剧主题和类型
+   - 情节关键节点
+   - 角色关系
+
+2. **技术特征**
+   - 画面质量评估
+   - 音频质量评估
+   - 剪辑节奏分析
+
+3. **编辑建议**
+   - 剪辑优化建议
+   - 特效添加建议
+   - 字幕处理建议
+""",
+    "basic": """
+## 分析要求 (基础分析)
+请提供以下基础分析：
+
+1. **内容概述**
+   - 视频主要内容
+   - 情节简述
+
+2. **技术评估**
+   - 画面和音频质量
+   - 基础编辑建议
+""",
+}
+
+
+# 批量分析的JSON结构
+_BATCH_ANALYSIS_SCHEMA: Final[str] = f"""{{
+    "analyses": [
+        {textwrap.indent(_ANALYSIS_SCHEMA, " " * 8).lstrip()}
+    ]
+}}"""
+
+# 编辑计划的要求说明、JSON结构和可用操作，编辑计划与合并提示词共用
+_PLAN_REQUIREMENTS: Final[str] = """
+## 编辑计划要求
+请制定一个详细的编辑计划，包含具体的编辑操作步骤：
+
+1. **项目规划**
+   - 确定项目名称
+   - 设定编辑目标
+   - 评估复杂度
+
+2. **编辑决策**
+   - 剪切和合并操作
+   - 特效添加
+   - 字幕处理
+   - 音频调整
+   - 转场效果
+
+3. **质量控制**
+   - 每个决策的置信度
+   - 决策理由说明
+"""
+
+_PLAN_SCHEMA: Final[str] = """{
+    "project_name": "项目名称",
+    "objective": "编辑目标描述",
+    "estimated_duration": 预估时长秒数,
+    "complexity_score": 复杂度评分1-10,
+    "decisions": [
+        {
+            "action": "操作类型",
+            "target": "目标对象",
+            "parameters": {
+                "具体参数": "参数值"
+            },
+            "confidence": 置信度0-1,
+            "reasoning": "决策理由"
+        }
+    ]
+}"""
+
+_PLAN_ACTIONS: Final[str] = """
+可用的操作类型包括：
+- cut: 剪切视频片段
+- merge: 合并视频片段
+- add_effect: 添加特效
+- add_subtitle: 添加字幕
+- adjust_audio: 调整音频
+- add_transition: 添加转场
+- color_correction: 色彩校正
+- speed_adjustment: 速度调整
+"""
+
+# 合并提示词的JSON结构，同时包含分析结果和编辑计划
+_FUSED_SCHEMA: Final[str] = f"""{{
+    "analysis": {textwrap.indent(_ANALYSIS_SCHEMA, " " * 4).lstrip()},
+    "plan": {textwrap.indent(_PLAN_SCHEMA, " " * 4).lstrip()}
+}}"""
+
+# 提示词按“固定前缀 + 视频相关内容”组织：前缀只取决于分析深度，
+# 同类请求的前缀逐字节相同，服务端可复用前缀的KV缓存，跳过这部分的预填充计算
+_ANALYSIS_PREFIXES: Final[dict[str, str]] = {
+    depth: (
+        "作为专业的视频编辑AI导演，请按以下要求分析短剧视频的内容特征，视频信息附在最后。\n"
+        + block
+        + f"""
+## 输出格式
+请按以下JSON格式输出分析结果：
+
+```json
+{_ANALYSIS_SCHEMA}
+```
+"""
+    )
+    for depth, block in _DEPTH_BLOCKS.items()
+}
+
+_BATCH_ANALYSIS_PREFIXES: Final[dict[str, str]] = {
+    depth: (
+        "作为专业的视频编辑AI导演，请按以下要求分别分析多个短剧视频的内容特征，各视频信息按编号附在最后。\n"
+        + block
+        + f"""
+## 输出格式
+请按以下JSON格式输出分析结果，analyses数组按视频编号顺序为每个视频给出一项：
+
+```json
+{_BATCH_ANALYSIS_SCHEMA}
+```
+"""
+    )
+    for depth, block in _DEPTH_BLOCKS.items()
+}
+
+_FUSED_PREFIXES: Final[dict[str, str]] = {
+    depth: (
+        "作为专业的视频编辑AI导演，请先分析短剧视频的内容特征，再基于分析结果制定详细的编辑计划，"
+        "视频信息、编辑目标和风格偏好附在最后。\n"
+        + block
+        + _PLAN_REQUIREMENTS
+        + f"""
+## 输出格式
+请按以下JSON格式同时输出分析结果(analysis)和编辑计划(plan)：
+
+```json
+{_FUSED_SCHEMA}
+```
+"""
+        + _PLAN_ACTIONS
+    )
+    for depth, block in _DEPTH_BLOCKS.items()
+}
+
+_PLAN_PREFIX: Final[str] = (
+    "作为专业的视频编辑AI导演，请基于视频分析结果制定详细的编辑计划，视频分析结果、编辑目标和风格偏好附在最后。\n"
+    + _PLAN_REQUIREMENTS
+    + f"""
+## 输出格式
+请按以下JSON格式输出编辑计划：
+
+```json
+{_PLAN_SCHEMA}
+```
+"""
+    + _PLAN_ACTIONS
+)
+
+
+def _prefix_for_depth(prefixes: dict[str, str], analysis_depth: str) -> str:
+    """返回分析深度对应的提示词前缀，未知深度按基础分析处理。"""
+    return prefixes.get(analysis_depth, prefixes["basic"])
+
+
+# 生成长度上限按JSON结构实际所需估算，输出越短响应越快
+_ANALYSIS_MAX_TOKENS = 900
+_PLAN_MAX_TOKENS = 1400
+
+# JSON序列化与解析优先使用orjson，未安装时回退到标准库json
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        # 与orjson一样输出紧凑格式
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+    _json_loads = json.loads
+
+_JSON_DECODER = json.JSONDecoder()
+
+# 大模型结果缓存的默认目录和有效期(秒)
+_CACHE_DIR = Path.home() / ".dramacraft" / "llm_cache"
+_CACHE_TTL = 7 * 86400
+# 提示词或结果结构变化时需递增，使旧缓存失效
+_PROMPT_VERSION = 1
+
+
+@dataclass(frozen=True)
 class EditingDecision:
-    """编辑决策。"""
+    """编辑决策，解析后不再修改。"""
+
+    # 项目仍支持Python 3.9，无法使用dataclass(slots=True)，手动声明槽位
+    __slots__ = ("action", "target", "parameters", "confidence", "reasoning")
 
     action: str
     """操作类型(cut, merge, add_effect, add_subtitle等)。"""
@@ -35,11 +300,24 @@ class EditingDecision:
     reasoning: str
     """决策理由。"""
 
+    # 冻结实例的槽位状态无法经由__setattr__恢复，与dataclass(slots=True)一样
+    # 自行提供状态读写，使pickle和copy可用
+    def __getstate__(self) -> tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple[Any, ...]) -> None:
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
 
 @dataclass
 class EditingPlan:
     """编辑计划。"""
 
+    __slots__ = (
+        "project_name", "objective", "decisions", "estimated_duration", "complexity_score"
+    )
+
     project_name: str
     """项目名称。"""
 
@@ -56,6 +334,208 @@ class EditingPlan:
     """复杂度评分。"""
 
 
+def _extract_json(text: str) -> Optional[dict[str, Any]]:
+    """从大模型响应中提取第一个完整的JSON对象，找不到时返回None。
+
+    先按首尾花括号整体解析(常见情形)，失败后再从每个'{'处逐一尝试解码，
+    以跳过正文中出现的零散花括号。
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    end = text.rfind('}') + 1
+    try:
+        obj = _json_loads(text[start:end])
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+    return None
+
+
+# 流式扫描时需要关注的字符：花括号、引号和转义符
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+
+
+class _JsonStreamScanner:
+    """增量扫描流式响应，在第一个可解析的完整JSON对象结束时给出其文本。"""
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """追加一段文本，找到完整的JSON对象时返回对象文本，否则返回None。"""
+        self.text += chunk
+        text = self.text
+
+        pos = self._pos
+        while True:
+            match = _JSON_TOKEN_RE.search(text, pos)
+            if match is None:
+                break
+            char = match.group()
+            pos = match.end()
+
+            if self._start == -1:
+                if char == '{':
+                    self._start, self._depth, self._in_string = match.start(), 1, False
+            elif self._in_string:
+                if char == '\\':
+                    pos += 1  # 跳过被转义的字符，可能落在下一段文本中
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == '{':
+                self._depth += 1
+            elif char == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = text[self._start:pos]
+                    try:
+                        _json_loads(candidate)
+                        return candidate
+                    except ValueError:
+                        # 正文中的零散花括号，从其后继续寻找
+                        pos = self._start + 1
+                        self._start = -1
+
+        self._pos = pos
+        return None
+
+
+class _ResultCache:
+    """大模型结果缓存，内存与磁盘两级，值须可JSON序列化。"""
+
+    def __init__(self, cache_dir: Optional[Path], ttl: int = _CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self._memory: dict[str, tuple[float, str]] = {}
+        self.logger = get_logger("ai.director.cache")
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """由任意可JSON序列化的部分生成缓存键。"""
+        # 键始终由标准库json生成，保证有无orjson时磁盘缓存都能命中
+        canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回None。"""
+        entry = self._memory.get(key)
+        if entry is None and self.cache_dir is not None:
+            try:
+                with open(self.cache_dir / f"{key}.json", encoding="utf-8") as f:
+                    header, _, payload = f.read().partition("\n")
+                entry = (float(header), payload)
+                self._memory[key] = entry
+            except (OSError, ValueError):
+                return None
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at < time.time():
+            self._memory.pop(key, None)
+            return None
+        # 每次返回新的副本，调用方修改结果不会污染缓存
+        try:
+            return _json_loads(payload)
+        except ValueError:
+            self._memory.pop(key, None)
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """写入缓存，磁盘写入失败时只保留内存缓存。"""
+        expires_at = time.time() + self.ttl
+        payload = _json_dumps(value)
+        self._memory[key] = (expires_at, payload)
+        if self.cache_dir is None:
+            return
+
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再原子替换，并发写入同一键时不会读到半截内容
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                # 首行为过期时间戳，其余为JSON内容
+                f.write(f"{expires_at!r}\n{payload}")
+            os.replace(tmp_path, self.cache_dir / f"{key}.json")
+        except OSError as e:
+            self.logger.debug("写入磁盘缓存失败: %s", e)
+
+
+def _subtitle_from_parameters(parameters: dict[str, Any]) -> dict[str, Any]:
+    """由add_subtitle决策参数构建字幕。"""
+    get = parameters.get
+    return {
+        "text": get("text", "字幕文本"),
+        "start_time": get("start_time", 0),
+        "duration": get("duration", 2000),
+        "style": get("style", {})
+    }
+
+
+def _effect_from_parameters(parameters: dict[str, Any]) -> dict[str, Any]:
+    """由add_effect决策参数构建特效。"""
+    get = parameters.get
+    return {
+        "type": get("type", "fade"),
+        "start_time": get("start_time", 0),
+        "end_time": get("end_time", 1000),
+        "parameters": parameters
+    }
+
+
+# 制定编辑计划时使用的分析字段，其余字段(情节概述、角色等)不放入提示词以节省token
+_PLAN_INPUT_KEYS: Final[tuple[str, ...]] = (
+    "content_type",
+    "theme",
+    "visual_style",
+    "editing_suggestions",
+    "highlights",
+)
+
+
+def _plan_input(video_analysis: dict[str, Any]) -> dict[str, Any]:
+    """从视频分析结果中提取制定编辑计划所需的字段。"""
+    plan_input = {
+        key: video_analysis[key] for key in _PLAN_INPUT_KEYS if key in video_analysis
+    }
+    duration = video_analysis.get("technical_info", {}).get("duration")
+    if duration is not None:
+        plan_input["duration"] = duration
+    return plan_input
+
+
+def _compact_style(style_preferences: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """去掉风格偏好中的空值。"""
+    return {
+        key: value
+        for key, value in (style_preferences or {}).items()
+        if value not in (None, "", [], {})
+    }
+
+
+# 编辑决策的操作类型 -> (草稿轨道, 构建函数)，未列出的操作不写入草稿
+_DECISION_HANDLERS = {
+    "add_subtitle": ("subtitles", _subtitle_from_parameters),
+    "add_effect": ("effects", _effect_from_parameters),
+}
+
+
 class AIDirector:
     """AI导演 - 智能视频编辑决策引擎。"""
 
@@ -63,7 +543,8 @@ class AIDirector:
         self,
         llm_client: BaseLLMClient,
         draft_manager: JianYingDraftManager,
-        video_processor: VideoProcessor
+        video_processor: VideoProcessor,
+        cache_dir: Optional[Path] = _CACHE_DIR
     ):
         """
         初始化AI导演。
@@ -72,11 +553,13 @@ class AIDirector:
             llm_client: 大模型客户端
             draft_manager: 草稿管理器
             video_processor: 视频处理器
+            cache_dir: 大模型结果的磁盘缓存目录，为None时仅使用内存缓存
         """
         self.llm_client = llm_client
         self.draft_manager = draft_manager
         self.video_processor = video_processor
         self.logger = get_logger("ai.director")
+        self._cache = _ResultCache(cache_dir)
 
         self.logger.info("AI导演已初始化")
 
@@ -96,151 +579,277 @@ class AIDirector:
             视频分析结果
         """
         video_path = Path(video_path)
-        self.logger.info(f"分析视频内容: {video_path}")
+        self.logger.info("分析视频内容: %s", video_path)
 
-        # 获取基础视频信息
-        video_info = self.video_processor.get_video_info(video_path)
+        # 获取基础视频信息并进行场景检测
+        video_info, scenes = await self._probe_video(video_path)
 
-        # 场景检测
-        scenes = self.video_processor.detect_scenes(video_path)
+        return await self._generate_analysis(video_info, scenes, analysis_depth)
 
-        # 使用大模型分析视频内容
-        analysis_prompt = self._build_video_analysis_prompt(
-            video_info, scenes, analysis_depth
+    async def _probe_video(self, video_path: Path) -> tuple[VideoInfo, list[Any]]:
+        """在线程中并行获取视频信息和检测场景，避免阻塞事件循环。"""
+        video_info, scenes = await asyncio.gather(
+            asyncio.to_thread(self.video_processor.get_video_info, video_path),
+            asyncio.to_thread(self.video_processor.detect_scenes, video_path)
         )
+        return video_info, scenes
 
-        params = GenerationParams(max_tokens=2000, temperature=0.3)
-        response = await self.llm_client.generate(analysis_prompt, params)
+    async def analyze_videos_batch(
+        self,
+        video_paths: list[Union[str, Path]],
+        analysis_depth: str = "detailed"
+    ) -> list[dict[str, Any]]:
+        """
+        在一次大模型请求中批量分析多个视频。
 
-        # 解析分析结果
-        analysis_result = self._parse_analysis_response(response.text, video_info, scenes)
+        批量响应无法解析或数量不符时，回退为逐个视频分析。
 
-        return analysis_result
+        Args:
+            video_paths: 视频文件路径列表
+            analysis_depth: 分析深度(basic, detailed, comprehensive)
 
-    def _build_video_analysis_prompt(
+        Returns:
+            与输入顺序一致的视频分析结果列表
+        """
+        video_paths = [Path(video_path) for video_path in video_paths]
+        self.logger.info("批量分析视频内容: %d 个", len(video_paths))
+
+        contexts = await asyncio.gather(*(
+            self._probe_video(video_path) for video_path in video_paths
+        ))
+        return await self._analyze_probed_batch(contexts, analysis_depth)
+
+    async def _analyze_probed_batch(
+        self,
+        contexts: list[tuple[VideoInfo, list[Any]]],
+        analysis_depth: str
+    ) -> list[dict[str, Any]]:
+        """基于已获取的视频信息和场景批量生成分析结果。"""
+        # 已缓存的视频直接复用分析结果，只把未命中的视频交给大模型
+        analyses = [
+            self._cached_analysis(video_info, scenes, analysis_depth)
+            for video_info, scenes in contexts
+        ]
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+        pending_contexts = [contexts[i] for i in pending]
+
+        if len(pending_contexts) == 1:
+            video_info, scenes = pending_contexts[0]
+            analyses[pending[0]] = await self._generate_analysis(
+                video_info, scenes, analysis_depth
+            )
+            return analyses
+        if not pending_contexts:
+            return analyses
+
+        batch_prompt = self._build_batch_analysis_prompt(pending_contexts, analysis_depth)
+
+        params = GenerationParams(
+            max_tokens=_ANALYSIS_MAX_TOKENS * len(pending_contexts),
+            temperature=0.3
+        )
+        response_text = await self._generate_json(batch_prompt, params)
+
+        pending_analyses = self._parse_batch_analysis_response(response_text, pending_contexts)
+        if pending_analyses is None:
+            self.logger.warning("批量分析响应解析失败，回退为逐个视频分析")
+            pending_analyses = await self._generate_analyses(pending_contexts, analysis_depth)
+        else:
+            for analysis, (video_info, _scenes) in zip(pending_analyses, pending_contexts):
+                self._cache.set(self._analysis_cache_key(video_info, analysis_depth), analysis)
+
+        for i, analysis in zip(pending, pending_analyses):
+            analyses[i] = analysis
+
+        return analyses
+
+    async def _generate_analysis(
         self,
         video_info: VideoInfo,
         scenes: list[Any],
         analysis_depth: str
-    ) -> str:
-        """构建视频分析提示词。"""
-        scene_count = len(scenes)
-        width, height = video_info.resolution
-        prompt = f"""
-作为专业的视频编辑AI导演，请分析以下短剧视频的内容特征：
+    ) -> dict[str, Any]:
+        """基于视频信息和场景调用大模型生成分析结果，优先使用缓存。"""
+        cached = self._cached_analysis(video_info, scenes, analysis_depth)
+        if cached is not None:
+            return cached
 
-## 视频基础信息
-- 文件路径: {video_info.path.name}
-- 时长: {video_info.duration:.1f}秒
-- 分辨率: {width}x{height}
-- 帧率: {video_info.fps}fps
-- 文件大小: {video_info.size_mb:.1f}MB
+        # 使用大模型分析视频内容
+        analysis_prompt = self._build_video_analysis_prompt(
+            video_info, scenes, analysis_depth
+        )
 
-## 场景信息
-检测到 {scene_count} 个场景：
-"""
+        params = GenerationParams(
+            max_tokens=_ANALYSIS_MAX_TOKENS,
+            temperature=0.3
+        )
+        response_text = await self._generate_json(analysis_prompt, params)
 
-        for i, scene in enumerate(scenes[:5]):  # 只显示前5个场景
-            scene_num = i + 1
-            prompt += f"- 场景{scene_num}: {scene.start_time:.1f}s-{scene.end_time:.1f}s, 亮度:{scene.average_brightness:.2f}, 运动强度:{scene.motion_intensity:.2f}\n"
+        return self._finish_analysis(response_text, video_info, scenes, analysis_depth)
 
-        if analysis_depth == "comprehensive":
-            prompt += """
-## 分析要求 (综合分析)
-请从以下维度深度分析视频内容：
+    async def _generate_analyses(
+        self,
+        contexts: list[tuple[VideoInfo, list[Any]]],
+        analysis_depth: str,
+        max_concurrency: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """逐个视频生成分析结果，未命中缓存的提示词一次性提交给大模型。"""
+        analyses = [
+            self._cached_analysis(video_info, scenes, analysis_depth)
+            for video_info, scenes in contexts
+        ]
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+        if not pending:
+            return analyses
+
+        prompts = [
+            self._build_video_analysis_prompt(*contexts[i], analysis_depth)
+            for i in pending
+        ]
+        params = GenerationParams(
+            max_tokens=_ANALYSIS_MAX_TOKENS,
+            temperature=0.3
+        )
+        responses = await self.llm_client.generate_many(prompts, params, max_concurrency)
 
-1. **内容类型识别**
-   - 短剧类型(都市、古装、悬疑、喜剧等)
-   - 情节发展阶段(开头、发展、高潮、结局)
-   - 主要角色数量和特征
+        for i, response in zip(pending, responses):
+            video_info, scenes = contexts[i]
+            analyses[i] = self._finish_analysis(
+                response.text, video_info, scenes, analysis_depth
+            )
 
-2. **视觉特征分析**
-   - 画面构图风格
-   - 色彩基调和情绪表达
-   - 镜头运动特点
-   - 场景转换节奏
+        return analyses
 
-3. **编辑建议**
-   - 适合的剪辑风格
-   - 推荐的特效类型
-   - 字幕添加建议
-   - 音乐配乐建议
+    def _finish_analysis(
+        self,
+        response_text: str,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        analysis_depth: str
+    ) -> dict[str, Any]:
+        """解析分析响应并写入缓存。"""
+        # 解析分析结果
+        analysis_result = self._parse_analysis_response(response_text, video_info, scenes)
 
-4. **观众吸引力评估**
-   - 内容亮点识别
-   - 潜在的观众群体
-   - 传播价值评估
-"""
-        elif analysis_depth == "detailed":
-            prompt += """
-## 分析要求 (详细分析)
-请分析以下关键要素：
+        # 解析失败或未返回JSON时得到的是占位结果，不写入缓存
+        if "error" not in analysis_result and "{" in response_text:
+            self._cache.set(
+                self._analysis_cache_key(video_info, analysis_depth), analysis_result
+            )
+
+        return analysis_result
+
+    async def _generate_json(self, prompt: str, params: GenerationParams) -> str:
+        """
+        流式调用大模型，第一个完整JSON对象结束时立即停止接收。
+
+        Returns:
+            截至该JSON对象结束的响应文本；未找到完整对象时为全部响应文本
+        """
+        scanner = _JsonStreamScanner()
+        chunks = self.llm_client.stream(prompt, params)
+        try:
+            async for chunk in chunks:
+                json_text = scanner.feed(chunk)
+                if json_text is not None:
+                    return json_text
+        finally:
+            # 提前返回时关闭生成器，释放底层的流式连接
+            await chunks.aclose()
+
+        return scanner.text
+
+    def _model_key_parts(self) -> tuple[Any, ...]:
+        """缓存键中区分模型和提示词版本的部分，切换模型或修改提示词后不会命中旧结果。"""
+        return (self.llm_client.provider_name, self.llm_client.model_name, _PROMPT_VERSION)
+
+    def _analysis_cache_key(self, video_info: VideoInfo, analysis_depth: str) -> str:
+        """由模型、提示词版本、视频路径、大小、时长、修改时间和分析深度生成分析缓存键。"""
+        try:
+            mtime_ns = os.stat(video_info.path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        return self._cache.make_key(
+            "analysis",
+            *self._model_key_parts(),
+            str(video_info.path),
+            video_info.size_mb,
+            video_info.duration,
+            mtime_ns,
+            analysis_depth
+        )
+
+    def _cached_analysis(
+        self,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        analysis_depth: str
+    ) -> Optional[dict[str, Any]]:
+        """读取缓存的分析结果，技术信息按当前探测结果重新生成。"""
+        cached = self._cache.get(self._analysis_cache_key(video_info, analysis_depth))
+        if cached is None:
+            return None
 
-1. **内容特征**
-   - 短剧主题和类型
-   - 情节关键节点
-   - 角色关系
+        self.logger.debug("命中分析缓存: %s", video_info.path)
+        cached["technical_info"] = self._technical_info(video_info, scenes)
+        return cached
 
-2. **技术特征**
-   - 画面质量评估
-   - 音频质量评估
-   - 剪辑节奏分析
+    def _build_video_analysis_prompt(
+        self,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        analysis_depth: str
+    ) -> str:
+        """构建视频分析提示词。"""
+        parts = [_prefix_for_depth(_ANALYSIS_PREFIXES, analysis_depth), "\n"]
+        self._append_video_section(parts, video_info, scenes)
+        parts.append("\n请基于视频的实际特征进行专业分析。")
 
-3. **编辑建议**
-   - 剪辑优化建议
-   - 特效添加建议
-   - 字幕处理建议
-"""
-        else:  # basic
-            prompt += """
-## 分析要求 (基础分析)
-请提供以下基础分析：
+        return "".join(parts).strip()
 
-1. **内容概述**
-   - 视频主要内容
-   - 情节简述
+    def _build_batch_analysis_prompt(
+        self,
+        contexts: list[tuple[VideoInfo, list[Any]]],
+        analysis_depth: str
+    ) -> str:
+        """构建多视频批量分析提示词。"""
+        parts = [_prefix_for_depth(_BATCH_ANALYSIS_PREFIXES, analysis_depth)]
 
-2. **技术评估**
-   - 画面和音频质量
-   - 基础编辑建议
-"""
+        for i, (video_info, scenes) in enumerate(contexts):
+            parts.append(f"\n# 视频{i + 1}\n\n")
+            self._append_video_section(parts, video_info, scenes)
 
-        prompt += """
-## 输出格式
-请按以下JSON格式输出分析结果：
+        parts.append(
+            f"\n请为以上{len(contexts)}个视频各给出一项分析结果，"
+            "并基于每个视频的实际特征分别进行专业分析。"
+        )
 
-```json
-{
-    "content_type": "短剧类型",
-    "theme": "主题描述",
-    "plot_summary": "情节概述",
-    "characters": ["角色1", "角色2"],
-    "visual_style": {
-        "composition": "构图风格",
-        "color_tone": "色彩基调",
-        "camera_movement": "镜头运动"
-    },
-    "technical_quality": {
-        "video_quality": "画面质量评分(1-10)",
-        "audio_quality": "音频质量评分(1-10)",
-        "editing_rhythm": "剪辑节奏评价"
-    },
-    "editing_suggestions": {
-        "style": "推荐剪辑风格",
-        "effects": ["推荐特效1", "推荐特效2"],
-        "subtitle_style": "字幕风格建议",
-        "music_style": "配乐风格建议"
-    },
-    "highlights": ["亮点1", "亮点2"],
-    "target_audience": "目标观众群体",
-    "viral_potential": "传播潜力评分(1-10)"
-}
-```
+        return "".join(parts).strip()
 
-请基于视频的实际特征进行专业分析。
-"""
+    def _append_video_section(
+        self,
+        parts: list[str],
+        video_info: VideoInfo,
+        scenes: list[Any]
+    ) -> None:
+        """将单个视频的基础信息和场景信息追加到提示词片段列表。"""
+        width, height = video_info.resolution
+        parts.append(f"""## 视频基础信息
+- 文件路径: {video_info.path.name}
+- 时长: {video_info.duration:.1f}秒
+- 分辨率: {width}x{height}
+- 帧率: {video_info.fps}fps
+- 文件大小: {video_info.size_mb:.1f}MB
 
-        return prompt.strip()
+## 场景信息
+检测到 {len(scenes)} 个场景：
+""")
+
+        # 只显示前5个场景
+        parts.extend(
+            f"- 场景{i + 1}: {scene.start_time:.1f}s-{scene.end_time:.1f}s, 亮度:{scene.average_brightness:.2f}, 运动强度:{scene.motion_intensity:.2f}\n"
+            for i, scene in enumerate(scenes[:5])
+        )
 
     def _parse_analysis_response(
         self,
@@ -249,55 +858,149 @@ class AIDirector:
         scenes: list[Any]
     ) -> dict[str, Any]:
         """解析视频分析响应。"""
-        try:
-            # 提取JSON
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-
-            if json_start != -1 and json_end > json_start:
-                json_text = response_text[json_start:json_end]
-                analysis_data = json.loads(json_text)
-            else:
-                # 如果没有找到JSON，创建基础分析
-                analysis_data = {
-                    "content_type": "短剧",
-                    "theme": "未知主题",
-                    "plot_summary": "需要进一步分析",
-                    "characters": [],
-                    "visual_style": {},
-                    "technical_quality": {},
-                    "editing_suggestions": {},
-                    "highlights": [],
-                    "target_audience": "通用观众",
-                    "viral_potential": 5
-                }
-
-            # 添加技术信息
-            analysis_data["technical_info"] = {
-                "duration": video_info.duration,
-                "resolution": video_info.resolution,
-                "fps": video_info.fps,
-                "file_size_mb": video_info.size_mb,
-                "scene_count": len(scenes)
-            }
-
-            return analysis_data
+        # 提取JSON
+        analysis_data = _extract_json(response_text)
 
-        except json.JSONDecodeError as e:
-            self.logger.warning(f"解析分析响应失败: {e}")
+        if analysis_data is None and '{' in response_text:
+            error = "响应中没有有效的JSON对象"
+            self.logger.warning("解析分析响应失败: %s", error)
             return {
                 "content_type": "短剧",
                 "theme": "解析失败",
-                "error": str(e),
-                "technical_info": {
-                    "duration": video_info.duration,
-                    "resolution": video_info.resolution,
-                    "fps": video_info.fps,
-                    "file_size_mb": video_info.size_mb,
-                    "scene_count": len(scenes)
-                }
+                "error": error,
+                "technical_info": self._technical_info(video_info, scenes)
             }
 
+        if analysis_data is None:
+            # 如果没有找到JSON，创建基础分析
+            analysis_data = {
+                "content_type": "短剧",
+                "theme": "未知主题",
+                "plot_summary": "需要进一步分析",
+                "characters": [],
+                "visual_style": {},
+                "technical_quality": {},
+                "editing_suggestions": {},
+                "highlights": [],
+                "target_audience": "通用观众",
+                "viral_potential": 5
+            }
+
+        # 添加技术信息
+        analysis_data["technical_info"] = self._technical_info(video_info, scenes)
+
+        return analysis_data
+
+    def _parse_batch_analysis_response(
+        self,
+        response_text: str,
+        contexts: list[tuple[VideoInfo, list[Any]]]
+    ) -> Optional[list[dict[str, Any]]]:
+        """解析批量分析响应，无法按视频逐一对应时返回None。"""
+        batch_data = _extract_json(response_text)
+        if batch_data is None:
+            return None
+
+        analyses = batch_data.get("analyses")
+        if (
+            not isinstance(analyses, list)
+            or len(analyses) != len(contexts)
+            or not all(isinstance(analysis, dict) for analysis in analyses)
+        ):
+            return None
+
+        for analysis_data, (video_info, scenes) in zip(analyses, contexts):
+            analysis_data["technical_info"] = self._technical_info(video_info, scenes)
+
+        return analyses
+
+    def _technical_info(self, video_info: VideoInfo, scenes: list[Any]) -> dict[str, Any]:
+        """汇总视频的技术信息。"""
+        return {
+            "duration": video_info.duration,
+            "resolution": video_info.resolution,
+            "fps": video_info.fps,
+            "file_size_mb": video_info.size_mb,
+            "scene_count": len(scenes)
+        }
+
+    async def analyze_and_plan(
+        self,
+        video_path: Union[str, Path],
+        editing_objective: str,
+        style_preferences: Optional[dict[str, Any]] = None,
+        analysis_depth: str = "detailed"
+    ) -> tuple[dict[str, Any], EditingPlan]:
+        """
+        在一次大模型请求中完成视频分析和编辑计划制定。
+
+        响应无法拆分为分析结果和编辑计划时，回退为先分析再制定计划的两步流程。
+        需要检查中间分析结果的调用方可直接使用 analyze_video_content 和 create_editing_plan。
+
+        Args:
+            video_path: 视频文件路径
+            editing_objective: 编辑目标
+            style_preferences: 风格偏好
+            analysis_depth: 分析深度(basic, detailed, comprehensive)
+
+        Returns:
+            (视频分析结果, 编辑计划)
+        """
+        video_path = Path(video_path)
+        self.logger.info("分析视频并创建编辑计划: %s", video_path)
+
+        video_info, scenes = await self._probe_video(video_path)
+        return await self._analyze_and_plan_probed(
+            video_info, scenes, editing_objective, style_preferences, analysis_depth
+        )
+
+    async def _analyze_and_plan_probed(
+        self,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        editing_objective: str,
+        style_preferences: Optional[dict[str, Any]],
+        analysis_depth: str
+    ) -> tuple[dict[str, Any], EditingPlan]:
+        """基于已获取的视频信息和场景完成分析和编辑计划制定。"""
+        # 分析结果已缓存时无需合并请求，编辑计划同样会优先使用缓存
+        analysis = self._cached_analysis(video_info, scenes, analysis_depth)
+        if analysis is not None:
+            editing_plan = await self.create_editing_plan(
+                analysis, editing_objective, style_preferences
+            )
+            return analysis, editing_plan
+
+        fused_prompt = self._build_fused_prompt(
+            video_info, scenes, editing_objective, style_preferences, analysis_depth
+        )
+
+        params = GenerationParams(
+            max_tokens=_ANALYSIS_MAX_TOKENS + _PLAN_MAX_TOKENS,
+            temperature=0.4
+        )
+        response_text = await self._generate_json(fused_prompt, params)
+
+        fused_result = self._parse_fused_response(
+            response_text, video_info, scenes, editing_objective
+        )
+        if fused_result is not None:
+            analysis, editing_plan = fused_result
+            self._cache.set(self._analysis_cache_key(video_info, analysis_depth), analysis)
+            if editing_plan.decisions:
+                self._cache.set(
+                    self._plan_cache_key(analysis, editing_objective, style_preferences),
+                    asdict(editing_plan)
+                )
+            return fused_result
+
+        self.logger.warning("合并响应解析失败，回退为分步分析和制定计划")
+        analysis = await self._generate_analysis(video_info, scenes, analysis_depth)
+        editing_plan = await self.create_editing_plan(
+            analysis, editing_objective, style_preferences
+        )
+        return analysis, editing_plan
+
     async def create_editing_plan(
         self,
         video_analysis: dict[str, Any],
@@ -315,23 +1018,52 @@ class AIDirector:
         Returns:
             编辑计划
         """
-        self.logger.info(f"创建编辑计划: {editing_objective}")
+        self.logger.info("创建编辑计划: %s", editing_objective)
+
+        cache_key = self._plan_cache_key(video_analysis, editing_objective, style_preferences)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self.logger.debug("命中编辑计划缓存: %s", editing_objective)
+            return self._plan_from_data(cached, editing_objective)
 
         # 构建编辑计划提示词
         plan_prompt = self._build_editing_plan_prompt(
             video_analysis, editing_objective, style_preferences
         )
 
-        params = GenerationParams(max_tokens=2500, temperature=0.5)
-        response = await self.llm_client.generate(plan_prompt, params)
+        params = GenerationParams(
+            max_tokens=_PLAN_MAX_TOKENS,
+            temperature=0.5
+        )
+        response_text = await self._generate_json(plan_prompt, params)
 
         # 解析编辑计划
         editing_plan = self._parse_editing_plan_response(
-            response.text, editing_objective
+            response_text, editing_objective
         )
 
+        # 解析失败时得到的是空计划，不写入缓存
+        if editing_plan.decisions:
+            self._cache.set(cache_key, asdict(editing_plan))
+
         return editing_plan
 
+    def _plan_cache_key(
+        self,
+        video_analysis: dict[str, Any],
+        editing_objective: str,
+        style_preferences: Optional[dict[str, Any]]
+    ) -> str:
+        """由模型、提示词版本、精简后的分析结果、编辑目标和风格偏好的规范化JSON生成编辑计划缓存键。"""
+        # 只取提示词实际使用的内容，未使用字段的差异不影响缓存命中
+        return self._cache.make_key(
+            "plan",
+            *self._model_key_parts(),
+            _plan_input(video_analysis),
+            editing_objective,
+            _compact_style(style_preferences)
+        )
+
     def _build_editing_plan_prompt(
         self,
         video_analysis: dict[str, Any],
@@ -339,12 +1071,10 @@ class AIDirector:
         style_preferences: Optional[dict[str, Any]]
     ) -> str:
         """构建编辑计划提示词。"""
-        analysis_json = json.dumps(video_analysis, ensure_ascii=False, indent=2)
-        style_json = json.dumps(style_preferences or {}, ensure_ascii=False, indent=2)
-
-        prompt = f"""
-作为专业的视频编辑AI导演，请基于视频分析结果制定详细的编辑计划。
+        analysis_json = _json_dumps(_plan_input(video_analysis))
+        style_json = _json_dumps(_compact_style(style_preferences))
 
+        prompt = _PLAN_PREFIX + f"""
 ## 视频分析结果
 {analysis_json}
 
@@ -354,62 +1084,35 @@ class AIDirector:
 ## 风格偏好
 {style_json}
 
-## 编辑计划要求
-请制定一个详细的编辑计划，包含具体的编辑操作步骤：
-
-1. **项目规划**
-   - 确定项目名称
-   - 设定编辑目标
-   - 评估复杂度
-
-2. **编辑决策**
-   - 剪切和合并操作
-   - 特效添加
-   - 字幕处理
-   - 音频调整
-   - 转场效果
+请确保编辑计划具有可执行性和专业性。
+"""
 
-3. **质量控制**
-   - 每个决策的置信度
-   - 决策理由说明
+        return prompt.strip()
 
-## 输出格式
-请按以下JSON格式输出编辑计划：
+    def _build_fused_prompt(
+        self,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        editing_objective: str,
+        style_preferences: Optional[dict[str, Any]],
+        analysis_depth: str = "detailed"
+    ) -> str:
+        """构建视频分析与编辑计划合并的提示词。"""
+        style_json = _json_dumps(_compact_style(style_preferences))
 
-```json
-{{
-    "project_name": "项目名称",
-    "objective": "编辑目标描述",
-    "estimated_duration": 预估时长秒数,
-    "complexity_score": 复杂度评分1-10,
-    "decisions": [
-        {{
-            "action": "操作类型",
-            "target": "目标对象",
-            "parameters": {{
-                "具体参数": "参数值"
-            }},
-            "confidence": 置信度0-1,
-            "reasoning": "决策理由"
-        }}
-    ]
-}}
-```
+        parts = [_prefix_for_depth(_FUSED_PREFIXES, analysis_depth), "\n"]
+        self._append_video_section(parts, video_info, scenes)
+        parts.append(f"""
+## 编辑目标
+{editing_objective}
 
-可用的操作类型包括：
-- cut: 剪切视频片段
-- merge: 合并视频片段
-- add_effect: 添加特效
-- add_subtitle: 添加字幕
-- adjust_audio: 调整音频
-- add_transition: 添加转场
-- color_correction: 色彩校正
-- speed_adjustment: 速度调整
+## 风格偏好
+{style_json}
 
-请确保编辑计划具有可执行性和专业性。
-"""
+请基于视频的实际特征进行专业分析，并确保编辑计划具有可执行性和专业性。
+""")
 
-        return prompt.strip()
+        return "".join(parts).strip()
 
     def _parse_editing_plan_response(
         self,
@@ -417,46 +1120,11 @@ class AIDirector:
         editing_objective: str
     ) -> EditingPlan:
         """解析编辑计划响应。"""
-        try:
-            # 提取JSON
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-
-            if json_start != -1 and json_end > json_start:
-                json_text = response_text[json_start:json_end]
-                plan_data = json.loads(json_text)
-            else:
-                # 创建基础计划
-                plan_data = {
-                    "project_name": "AI编辑项目",
-                    "objective": editing_objective,
-                    "estimated_duration": 60.0,
-                    "complexity_score": 5.0,
-                    "decisions": []
-                }
-
-            # 解析编辑决策
-            decisions = []
-            for decision_data in plan_data.get("decisions", []):
-                decision = EditingDecision(
-                    action=decision_data.get("action", "unknown"),
-                    target=decision_data.get("target", "video"),
-                    parameters=decision_data.get("parameters", {}),
-                    confidence=decision_data.get("confidence", 0.5),
-                    reasoning=decision_data.get("reasoning", "AI决策")
-                )
-                decisions.append(decision)
-
-            return EditingPlan(
-                project_name=plan_data.get("project_name", "AI编辑项目"),
-                objective=plan_data.get("objective", editing_objective),
-                decisions=decisions,
-                estimated_duration=plan_data.get("estimated_duration", 60.0),
-                complexity_score=plan_data.get("complexity_score", 5.0)
-            )
+        # 提取JSON
+        plan_data = _extract_json(response_text)
 
-        except json.JSONDecodeError as e:
-            self.logger.warning(f"解析编辑计划失败: {e}")
+        if plan_data is None and '{' in response_text:
+            self.logger.warning("解析编辑计划失败: 响应中没有有效的JSON对象")
             return EditingPlan(
                 project_name="AI编辑项目",
                 objective=editing_objective,
@@ -465,11 +1133,66 @@ class AIDirector:
                 complexity_score=1.0
             )
 
+        if plan_data is None:
+            # 创建基础计划
+            plan_data = {
+                "project_name": "AI编辑项目",
+                "objective": editing_objective,
+                "estimated_duration": 60.0,
+                "complexity_score": 5.0,
+                "decisions": []
+            }
+
+        return self._plan_from_data(plan_data, editing_objective)
+
+    def _plan_from_data(self, plan_data: dict[str, Any], editing_objective: str) -> EditingPlan:
+        """将编辑计划JSON数据转换为编辑计划对象。"""
+        # 解析编辑决策
+        decisions = []
+        for decision_data in plan_data.get("decisions", []):
+            decision = EditingDecision(
+                action=decision_data.get("action", "unknown"),
+                target=decision_data.get("target", "video"),
+                parameters=decision_data.get("parameters", {}),
+                confidence=decision_data.get("confidence", 0.5),
+                reasoning=decision_data.get("reasoning", "AI决策")
+            )
+            decisions.append(decision)
+
+        return EditingPlan(
+            project_name=plan_data.get("project_name", "AI编辑项目"),
+            objective=plan_data.get("objective", editing_objective),
+            decisions=decisions,
+            estimated_duration=plan_data.get("estimated_duration", 60.0),
+            complexity_score=plan_data.get("complexity_score", 5.0)
+        )
+
+    def _parse_fused_response(
+        self,
+        response_text: str,
+        video_info: VideoInfo,
+        scenes: list[Any],
+        editing_objective: str
+    ) -> Optional[tuple[dict[str, Any], EditingPlan]]:
+        """解析合并请求的响应，缺少分析结果或编辑计划时返回None。"""
+        fused_data = _extract_json(response_text)
+        if fused_data is None:
+            return None
+
+        analysis_data = fused_data.get("analysis")
+        plan_data = fused_data.get("plan")
+        if not isinstance(analysis_data, dict) or not isinstance(plan_data, dict):
+            return None
+
+        analysis_data["technical_info"] = self._technical_info(video_info, scenes)
+        return analysis_data, self._plan_from_data(plan_data, editing_objective)
+
     async def execute_editing_plan(
         self,
         editing_plan: EditingPlan,
         source_videos: list[Union[str, Path]],
-        output_dir: Optional[Path] = None
+        output_dir: Optional[Path] = None,
+        video_infos: Optional[list[VideoInfo]] = None
     ) -> Path:
         """
         执行编辑计划，生成剪映草稿。
@@ -478,82 +1201,229 @@ class AIDirector:
             editing_plan: 编辑计划
             source_videos: 源视频文件列表
             output_dir: 输出目录
+            video_infos: 与源视频一一对应的已知视频信息，提供时不再重新获取
 
         Returns:
             生成的草稿文件路径
         """
-        self.logger.info(f"执行编辑计划: {editing_plan.project_name}")
-
-        # 准备视频片段
-        video_clips = []
-        for _i, video_path in enumerate(source_videos):
-            video_info = self.video_processor.get_video_info(video_path)
-            clip = {
-                "path": str(video_path),
-                "duration": int(video_info.duration * 1000),  # 转换为毫秒
-                "width": video_info.resolution[0],
-                "height": video_info.resolution[1],
-                "start_time": 0,
-                "end_time": int(video_info.duration * 1000)
+        self.logger.info("执行编辑计划: %s", editing_plan.project_name)
+
+        # 准备视频片段，未提供视频信息时在线程中并行获取
+        if video_infos is None:
+            video_infos = await asyncio.gather(*(
+                asyncio.to_thread(self.video_processor.get_video_info, video_path)
+                for video_path in source_videos
+            ))
+        video_clips = [
+            self._video_clip(video_path, video_info)
+            for video_path, video_info in zip(source_videos, video_infos)
+        ]
+
+        # 处理编辑决策，按操作类型分派到对应的草稿轨道；没有决策时各轨道均为空
+        audio_clips = subtitles = effects = None
+        if editing_plan.decisions:
+            tracks: dict[str, list[dict[str, Any]]] = {
+                "audio_clips": [],
+                "subtitles": [],
+                "effects": []
             }
-            video_clips.append(clip)
-
-        # 处理编辑决策
-        audio_clips = []
-        subtitles = []
-        effects = []
-
-        for decision in editing_plan.decisions:
-            if decision.action == "add_subtitle":
-                subtitle = {
-                    "text": decision.parameters.get("text", "字幕文本"),
-                    "start_time": decision.parameters.get("start_time", 0),
-                    "duration": decision.parameters.get("duration", 2000),
-                    "style": decision.parameters.get("style", {})
-                }
-                subtitles.append(subtitle)
-
-            elif decision.action == "add_effect":
-                effect = {
-                    "type": decision.parameters.get("type", "fade"),
-                    "start_time": decision.parameters.get("start_time", 0),
-                    "end_time": decision.parameters.get("end_time", 1000),
-                    "parameters": decision.parameters
-                }
-                effects.append(effect)
+
+            for decision in editing_plan.decisions:
+                handler = _DECISION_HANDLERS.get(decision.action)
+                if handler is not None:
+                    track, build = handler
+                    tracks[track].append(build(decision.parameters))
+
+            audio_clips = tracks["audio_clips"] or None
+            subtitles = tracks["subtitles"] or None
+            effects = tracks["effects"] or None
 
         # 创建剪映草稿
         draft_file = self.draft_manager.create_draft(
             project_name=editing_plan.project_name,
             video_clips=video_clips,
-            audio_clips=audio_clips if audio_clips else None,
-            subtitles=subtitles if subtitles else None,
-            effects=effects if effects else None
+            audio_clips=audio_clips,
+            subtitles=subtitles,
+            effects=effects
         )
 
-        self.logger.info(f"编辑计划执行完成，草稿文件: {draft_file}")
+        self.logger.info("编辑计划执行完成，草稿文件: %s", draft_file)
         return draft_file
 
+    @staticmethod
+    def _video_clip(video_path: Union[str, Path], video_info: VideoInfo) -> dict[str, Any]:
+        """构建草稿中的整段视频片段，时间单位为毫秒。"""
+        duration_ms = int(video_info.duration * 1000)  # 转换为毫秒
+        width, height = video_info.resolution
+        return {
+            "path": str(video_path),
+            "duration": duration_ms,
+            "width": width,
+            "height": height,
+            "start_time": 0,
+            "end_time": duration_ms
+        }
+
+    async def smart_edit_workflow_stream(
+        self,
+        video_paths: list[Union[str, Path]],
+        editing_objective: str,
+        style_preferences: Optional[dict[str, Any]] = None,
+        auto_import: bool = False,
+        concurrency: int = 4,
+        batch_size: int = 4,
+        fuse_plan: bool = True
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        智能编辑工作流程的流式版本，每完成一个阶段即产出一个事件。
+
+        事件格式为 {"stage": 阶段, "data": 结果}，阶段包括：
+        plan(编辑计划)、draft(草稿文件路径)、import(是否已导入剪映，仅auto_import时)
+        和 analysis(全部视频的分析结果)。合并模式下主视频的编辑计划就绪后立即生成草稿，
+        与其余视频的分析并行，因此 analysis 可能在 draft 之后产出。
+        任一阶段失败时直接抛出异常。
+
+        Args:
+            video_paths: 视频文件路径列表
+            editing_objective: 编辑目标
+            style_preferences: 风格偏好
+            auto_import: 是否自动导入到剪映
+            concurrency: 同时进行的分析请求数量上限
+            batch_size: 每次大模型请求合并分析的视频数量
+            fuse_plan: 是否将主视频分析与编辑计划合并为一次请求
+
+        Yields:
+            工作流程阶段事件
+        """
+        if not video_paths:
+            raise ValueError("未提供视频文件")
+
+        # 1. 获取所有视频的信息和场景，后续分析与草稿生成复用同一份结果
+        contexts = await asyncio.gather(*(
+            self._probe_video(Path(video_path)) for video_path in video_paths
+        ))
+        video_infos = [video_info for video_info, _scenes in contexts]
+
+        # 2. 分析视频并创建编辑计划
+        # 以第一个视频作为主要参考：默认其分析与编辑计划合并为一次请求，
+        # 其余视频分批合并分析；各请求并行，信号量限制同时进行的大模型请求数。
+        # 不合并(batch_size为1)时，各视频的分析提示词一次性提交，交由服务端连续批处理
+        semaphore = asyncio.Semaphore(concurrency)
+        batch_size = max(batch_size, 1)
+        remaining = contexts[1:] if fuse_plan else contexts
+        batches = [
+            remaining[i:i + batch_size]
+            for i in range(0, len(remaining), batch_size)
+        ]
+
+        async def analyze(
+            batch: list[tuple[VideoInfo, list[Any]]]
+        ) -> list[dict[str, Any]]:
+            async with semaphore:
+                return await self._analyze_probed_batch(batch, "detailed")
+
+        async def analyze_and_plan_main() -> tuple[dict[str, Any], EditingPlan]:
+            video_info, scenes = contexts[0]
+            async with semaphore:
+                return await self._analyze_and_plan_probed(
+                    video_info, scenes, editing_objective, style_preferences, "detailed"
+                )
+
+        async def analyze_each() -> list[dict[str, Any]]:
+            # 各视频的提示词一次性交给generate_many，其并发上限与主视频请求
+            # 共同受concurrency约束：主视频请求并行时为其留出一个名额
+            if fuse_plan and concurrency > 1:
+                return await self._generate_analyses(
+                    remaining, "detailed", max_concurrency=concurrency - 1
+                )
+            async with semaphore:
+                return await self._generate_analyses(
+                    remaining, "detailed", max_concurrency=concurrency
+                )
+
+        if batch_size == 1 and remaining:
+            batch_tasks = [asyncio.ensure_future(analyze_each())]
+        else:
+            batch_tasks = [asyncio.ensure_future(analyze(batch)) for batch in batches]
+        main_task = asyncio.ensure_future(analyze_and_plan_main()) if fuse_plan else None
+
+        async def finish_draft(editing_plan: EditingPlan) -> AsyncIterator[dict[str, Any]]:
+            # 执行编辑计划
+            draft_file = await self.execute_editing_plan(
+                editing_plan, video_paths, video_infos=video_infos
+            )
+            yield {"stage": "draft", "data": draft_file}
+
+            # 自动导入到剪映（如果启用）
+            if auto_import:
+                imported = self.draft_manager.import_to_jianying(draft_file)
+                yield {"stage": "import", "data": imported}
+
+        try:
+            if main_task is not None:
+                # 合并模式：编辑计划就绪后立即生成草稿，其余视频的分析在后台继续
+                main_analysis, editing_plan = await main_task
+                yield {"stage": "plan", "data": editing_plan}
+                async for event in finish_draft(editing_plan):
+                    yield event
+                video_analyses = [main_analysis]
+            else:
+                video_analyses = []
+
+            results = await asyncio.gather(*batch_tasks, return_exceptions=True)
+            # 等待全部请求结束后再抛出首个错误，避免遗留未完成的任务
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            for batch_result in results:
+                video_analyses.extend(batch_result)
+            yield {"stage": "analysis", "data": video_analyses}
+
+            if main_task is None:
+                # 分步模式下基于第一个视频的分析结果创建编辑计划
+                editing_plan = await self.create_editing_plan(
+                    video_analyses[0], editing_objective, style_preferences
+                )
+                yield {"stage": "plan", "data": editing_plan}
+                async for event in finish_draft(editing_plan):
+                    yield event
+        finally:
+            # 出错或调用方提前停止迭代时取消仍在进行的分析请求，并等待全部任务结束，
+            # 取走已失败任务的异常，避免asyncio报告"Task exception was never retrieved"
+            tasks = [task for task in [main_task, *batch_tasks] if task is not None]
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
     async def smart_edit_workflow(
         self,
         video_paths: list[Union[str, Path]],
         editing_objective: str,
         style_preferences: Optional[dict[str, Any]] = None,
-        auto_import: bool = False
+        auto_import: bool = False,
+        concurrency: int = 4,
+        batch_size: int = 4,
+        fuse_plan: bool = True
     ) -> dict[str, Any]:
         """
         智能编辑工作流程 - 一键完成从分析到草稿生成。
 
+        需要在各阶段完成时及时处理结果的调用方可使用 smart_edit_workflow_stream。
+
         Args:
             video_paths: 视频文件路径列表
             editing_objective: 编辑目标
             style_preferences: 风格偏好
             auto_import: 是否自动导入到剪映
+            concurrency: 同时进行的分析请求数量上限
+            batch_size: 每次大模型请求合并分析的视频数量
+            fuse_plan: 是否将主视频分析与编辑计划合并为一次请求
 
         Returns:
             工作流程结果
         """
-        self.logger.info(f"开始智能编辑工作流程: {editing_objective}")
+        self.logger.info("开始智能编辑工作流程: %s", editing_objective)
 
         workflow_result = {
             "success": False,
@@ -563,35 +1433,33 @@ class AIDirector:
             "imported_to_jianying": False,
             "error": None
         }
+        result_keys = {
+            "analysis": "video_analyses",
+            "plan": "editing_plan",
+            "draft": "draft_file",
+            "import": "imported_to_jianying"
+        }
 
         try:
-            # 1. 分析所有视频
-            for video_path in video_paths:
-                analysis = await self.analyze_video_content(video_path, "detailed")
-                workflow_result["video_analyses"].append(analysis)
-
-            # 2. 创建编辑计划
-            # 使用第一个视频的分析结果作为主要参考
-            main_analysis = workflow_result["video_analyses"][0]
-            editing_plan = await self.create_editing_plan(
-                main_analysis, editing_objective, style_preferences
-            )
-            workflow_result["editing_plan"] = editing_plan
-
-            # 3. 执行编辑计划
-            draft_file = await self.execute_editing_plan(editing_plan, video_paths)
-            workflow_result["draft_file"] = str(draft_file)
-
-            # 4. 自动导入到剪映（如果启用）
-            if auto_import:
-                imported = self.draft_manager.import_to_jianying(draft_file)
-                workflow_result["imported_to_jianying"] = imported
+            async for event in self.smart_edit_workflow_stream(
+                video_paths,
+                editing_objective,
+                style_preferences,
+                auto_import=auto_import,
+                concurrency=concurrency,
+                batch_size=batch_size,
+                fuse_plan=fuse_plan
+            ):
+                data = event["data"]
+                if event["stage"] == "draft":
+                    data = str(data)
+                workflow_result[result_keys[event["stage"]]] = data
 
             workflow_result["success"] = True
             self.logger.info("智能编辑工作流程完成")
 
         except Exception as e:
-            self.logger.error(f"智能编辑工作流程失败: {e}")
+            self.logger.error("智能编辑工作流程失败: %s", e)
             workflow_result["error"] = str(e)
 
         return workflow_result
@@ -5,24 +5,76 @@
 确保生成的文案与视频画面内容精确匹配。
 """
 
-from dataclasses import asdict, dataclass
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter, deque
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, is_dataclass
 from pathlib import Path
 from typing import Any, Optional, Union
 
 import cv2
 import librosa
 import numpy as np
+import soundfile
 import speech_recognition as sr
 
 from ..llm.base import BaseLLMClient, GenerationParams
 from ..utils.helpers import validate_video_file
 from ..utils.logging import get_logger
 
+# PyAV可按关键帧跳转并只转换采样帧，未安装时回退到OpenCV逐帧读取
+try:
+    import av
+except ImportError:
+    av = None
+
+# 单帧分析主要是释放GIL的OpenCV/NumPy计算，所有分析器共用一个线程池并行执行；
+# 线程按需创建并在分析器之间复用，不会随分析器实例增加
+_CV_WORKERS = os.cpu_count() or 1
+_CV_POOL = ThreadPoolExecutor(max_workers=_CV_WORKERS, thread_name_prefix="deep-analyzer")
+
+# 线程池各线程自己的人脸检测器和图像缓冲区
+_CV_LOCAL = threading.local()
+
+# 人脸检测模型文件
+_FACE_CASCADE_FILE = 'haarcascade_frontalface_default.xml'
+
+# 颜色统计和运动检测使用的缩略图尺寸(宽, 高)
+_THUMBNAIL_SIZE = (160, 90)
+
+# 帧分析与音频分析结果的磁盘缓存目录，键中包含文件修改时间和大小，文件变化后自动失效
+_CACHE_DIR = Path.home() / ".dramacraft" / "analysis_cache"
+
+# 分析算法变化时递增，使旧的缓存结果失效
+_CACHE_VERSION = 1
+
+# 音频频谱分析的帧移(采样点)，以及整轨STFT分块计算的时长(秒)，避免长音频的频谱占用过多内存
+_STFT_HOP = 512
+_STFT_BLOCK_SECONDS = 60.0
+
+# 每次请求合并生成描述的场景数量上限
+_SCENE_BATCH_SIZE = 20
+
+# 相邻采样点间隔超过该时长(秒，约为常见GOP长度)时直接跳转，而不是顺序解码中间帧
+_SEEK_MIN_GAP = 2.0
+
 
 @dataclass
 class FrameAnalysis:
     """单帧分析结果。"""
 
+    # 项目仍支持Python 3.9，无法使用dataclass(slots=True)，手动声明槽位
+    __slots__ = (
+        "timestamp", "frame_number", "scene_type", "dominant_colors", "brightness",
+        "motion_intensity", "face_count", "objects", "composition", "emotional_tone",
+    )
+
     timestamp: float
     """时间戳(秒)。"""
 
@@ -58,6 +110,11 @@ class FrameAnalysis:
 class AudioSegment:
     """音频片段分析。"""
 
+    __slots__ = (
+        "start_time", "end_time", "audio_type", "volume_level", "speech_text",
+        "speaker_emotion", "background_music", "audio_quality",
+    )
+
     start_time: float
     """开始时间(秒)。"""
 
@@ -87,6 +144,12 @@ class AudioSegment:
 class SceneSegment:
     """场景片段。"""
 
+    __slots__ = (
+        "start_time", "end_time", "scene_id", "scene_description", "location", "characters",
+        "actions", "dialogue_summary", "emotional_arc", "visual_style",
+        "narrative_importance",
+    )
+
     start_time: float
     """开始时间(秒)。"""
 
@@ -125,6 +188,11 @@ class SceneSegment:
 class DeepAnalysisResult:
     """深度分析结果。"""
 
+    __slots__ = (
+        "video_path", "total_duration", "frame_rate", "resolution", "frame_analyses",
+        "audio_segments", "scene_segments", "overall_summary", "content_timeline",
+    )
+
     video_path: Path
     """视频文件路径。"""
 
@@ -153,17 +221,53 @@ class DeepAnalysisResult:
     """内容时间轴。"""
 
 
+# 颜色名称，顺序与 _classify_colors 中的判断条件一致
+_COLOR_NAMES = ("白色", "黑色", "红色", "绿色", "蓝色", "黄色", "紫色", "青色", "灰色")
+
+
+def _classify_colors(rgb: np.ndarray) -> list[str]:
+    """
+    将一组RGB值批量转换为颜色名称。
+
+    Args:
+        rgb: 形状为(n, 3)的RGB数组
+
+    Returns:
+        与输入顺序对应的颜色名称列表
+    """
+    # 简化的颜色映射，按条件顺序取第一个满足的颜色
+    r, g, b = rgb.astype(np.int32).T
+    conditions = [
+        (r > 200) & (g > 200) & (b > 200),
+        (r < 50) & (g < 50) & (b < 50),
+        (r > g) & (r > b),
+        (g > r) & (g > b),
+        (b > r) & (b > g),
+        (r > 150) & (g > 150),
+        (r > 150) & (b > 150),
+        (g > 150) & (b > 150),
+    ]
+    indices = np.select(conditions, list(range(len(conditions))), default=len(conditions))
+    return [_COLOR_NAMES[i] for i in indices]
+
+
 class DeepVideoAnalyzer:
     """深度视频分析器。"""
 
-    def __init__(self, llm_client: BaseLLMClient):
+    def __init__(
+        self,
+        llm_client: BaseLLMClient,
+        cache_dir: Optional[Path] = _CACHE_DIR
+    ):
         """
         初始化深度分析器。
 
         Args:
             llm_client: 大模型客户端
+            cache_dir: 分析结果缓存目录，为None时不使用磁盘缓存
         """
         self.llm_client = llm_client
+        self.cache_dir = cache_dir
         self.logger = get_logger("analysis.deep_analyzer")
 
         # 初始化计算机视觉模型
@@ -179,7 +283,7 @@ class DeepVideoAnalyzer:
         try:
             # 人脸检测器
             self.face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+                cv2.data.haarcascades + _FACE_CASCADE_FILE
             )
 
             # 物体检测模型 (使用预训练的COCO模型)
@@ -195,7 +299,8 @@ class DeepVideoAnalyzer:
         video_path: Union[str, Path],
         analysis_interval: float = 1.0,
         include_audio: bool = True,
-        max_frames: Optional[int] = None
+        max_frames: Optional[int] = None,
+        use_cache: bool = True
     ) -> DeepAnalysisResult:
         """
         对视频进行深度分析。
@@ -205,6 +310,7 @@ class DeepVideoAnalyzer:
             analysis_interval: 分析间隔(秒)
             include_audio: 是否包含音频分析
             max_frames: 最大分析帧数
+            use_cache: 是否复用同一视频文件已缓存的帧分析和音频分析结果
 
         Returns:
             深度分析结果
@@ -225,16 +331,25 @@ class DeepVideoAnalyzer:
         duration = frame_count / fps if fps > 0 else 0
 
         # 逐帧分析
-        frame_analyses = await self._analyze_frames(
-            cap, fps, analysis_interval, max_frames
-        )
+        frames_cache = self._cache_path(video_path, "frames", analysis_interval, max_frames) \
+            if use_cache else None
+        frame_analyses = self._load_cache(frames_cache, FrameAnalysis)
+        if frame_analyses is None:
+            frame_analyses = await self._analyze_frames(
+                cap, fps, analysis_interval, max_frames, video_path
+            )
+            self._save_cache(frames_cache, frame_analyses)
 
         cap.release()
 
         # 音频分析
         audio_segments = []
         if include_audio:
-            audio_segments = await self._analyze_audio(video_path)
+            audio_cache = self._cache_path(video_path, "audio") if use_cache else None
+            audio_segments = self._load_cache(audio_cache, AudioSegment)
+            if audio_segments is None:
+                audio_segments = await self._analyze_audio(video_path)
+                self._save_cache(audio_cache, audio_segments)
 
         # 场景分割和分析
         scene_segments = await self._analyze_scenes(
@@ -266,30 +381,129 @@ class DeepVideoAnalyzer:
         self.logger.info(f"深度分析完成: {len(frame_analyses)}帧, {len(scene_segments)}个场景")
         return result
 
+    def _cache_path(self, video_path: Path, kind: str, *parts: Any) -> Optional[Path]:
+        """生成分析结果的缓存文件路径，未启用缓存时返回None。"""
+        if self.cache_dir is None:
+            return None
+
+        stat = video_path.stat()
+        raw = (
+            f"{_CACHE_VERSION}:{video_path.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:"
+            f"{kind}:{parts!r}"
+        )
+        digest = hashlib.blake2b(raw.encode("utf-8"), digest_size=20).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cache(self, cache_path: Optional[Path], record_type: type) -> Optional[list]:
+        """读取缓存的分析结果，未命中或内容损坏时返回None。"""
+        if cache_path is None:
+            return None
+
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return [record_type(**record) for record in json.load(f)]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.debug(f"读取分析缓存失败: {e}")
+            return None
+
+    def _save_cache(self, cache_path: Optional[Path], records: list) -> None:
+        """写入分析结果缓存；结果为空时可能是分析失败，不写入。"""
+        if cache_path is None or not records:
+            return
+
+        try:
+            payload = json.dumps([asdict(record) for record in records], ensure_ascii=False)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # 先写临时文件再原子替换，并发写入同一文件时不会读到半截内容
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError) as e:
+            self.logger.debug(f"写入分析缓存失败: {e}")
+
     async def _analyze_frames(
         self,
         cap: cv2.VideoCapture,
         fps: float,
         interval: float,
-        max_frames: Optional[int]
+        max_frames: Optional[int],
+        video_path: Optional[Path] = None
     ) -> list[FrameAnalysis]:
         """分析视频帧。"""
+        loop = asyncio.get_running_loop()
         frame_analyses = []
-        frame_interval = int(fps * interval)
+
+        # 解码的同时在线程池中分析已采样的帧；限制排队帧数以控制内存占用，
+        # 按提交顺序取回结果即可保持帧顺序
+        pending = deque()
+        max_pending = _CV_WORKERS * 2
+        prev_gray = None
+        # 当前帧与上一帧的灰度缩略图交替写入两个预分配的缓冲区
+        gray_buffers = [
+            np.empty(_THUMBNAIL_SIZE[::-1], dtype=np.uint8),
+            np.empty(_THUMBNAIL_SIZE[::-1], dtype=np.uint8),
+        ]
+
+        for frame, timestamp, frame_number in self._iter_sampled_frames(
+            cap, fps, interval, max_frames, video_path
+        ):
+            # 运动强度依赖上一采样帧，在缩略图上按顺序计算
+            thumbnail = self._make_thumbnail(frame)
+            gray_buffer = gray_buffers[1] if prev_gray is gray_buffers[0] else gray_buffers[0]
+            thumbnail_gray = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY, dst=gray_buffer)
+            motion_intensity = self._calculate_motion_intensity(thumbnail_gray, prev_gray)
+            prev_gray = thumbnail_gray
+
+            pending.append(loop.run_in_executor(
+                _CV_POOL, self._analyze_single_frame_sync,
+                frame, timestamp, frame_number, thumbnail, motion_intensity
+            ))
+            if len(pending) >= max_pending:
+                frame_analyses.append(await pending.popleft())
+
+        frame_analyses.extend(await asyncio.gather(*pending))
+        return frame_analyses
+
+    def _iter_sampled_frames(
+        self,
+        cap: cv2.VideoCapture,
+        fps: float,
+        interval: float,
+        max_frames: Optional[int],
+        video_path: Optional[Path] = None
+    ) -> Iterator[tuple[np.ndarray, float, int]]:
+        """按分析间隔产出采样帧(图像, 时间戳, 帧编号)，只有采样帧才转换为BGR图像。"""
+        if fps <= 0:
+            return
+
+        frame_interval = max(int(fps * interval), 1)
+
+        if av is not None and video_path is not None:
+            try:
+                container = av.open(str(video_path))
+            except Exception as e:
+                self.logger.debug(f"PyAV打开视频失败，改用OpenCV解码: {e}")
+            else:
+                with container:
+                    yield from self._decode_sampled_frames(
+                        container, fps, frame_interval, max_frames
+                    )
+                return
+
+        # OpenCV回退：跳过的帧只grab不retrieve，省去颜色转换和数组拷贝
         frame_number = 0
         analyzed_count = 0
 
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
+        while cap.grab():
             if frame_number % frame_interval == 0:
-                timestamp = frame_number / fps
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
 
-                # 分析当前帧
-                analysis = await self._analyze_single_frame(frame, timestamp, frame_number)
-                frame_analyses.append(analysis)
+                yield frame, frame_number / fps, frame_number
 
                 analyzed_count += 1
                 if max_frames and analyzed_count >= max_frames:
@@ -297,7 +511,45 @@ class DeepVideoAnalyzer:
 
             frame_number += 1
 
-        return frame_analyses
+    def _decode_sampled_frames(
+        self,
+        container: Any,
+        fps: float,
+        frame_interval: int,
+        max_frames: Optional[int]
+    ) -> Iterator[tuple[np.ndarray, float, int]]:
+        """用PyAV解码采样帧，间隔较大时按关键帧跳转，避免解码不会被分析的帧。"""
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        time_base = stream.time_base
+        start_pts = stream.start_time or 0
+        half_frame = 0.5 / fps
+
+        frames = container.decode(stream)
+        current_time = 0.0
+        frame_number = 0
+        analyzed_count = 0
+
+        while not max_frames or analyzed_count < max_frames:
+            target_time = frame_number / fps
+
+            # seek会定位到目标之前最近的关键帧，之后只需解码到目标帧
+            if target_time - current_time > _SEEK_MIN_GAP:
+                container.seek(int(target_time / time_base) + start_pts, stream=stream)
+                frames = container.decode(stream)
+
+            for frame in frames:
+                if frame.pts is None:
+                    continue
+                current_time = float((frame.pts - start_pts) * time_base)
+                if current_time >= target_time - half_frame:
+                    yield frame.to_ndarray(format="bgr24"), target_time, frame_number
+                    break
+            else:
+                return
+
+            analyzed_count += 1
+            frame_number += frame_interval
 
     async def _analyze_single_frame(
         self,
@@ -306,22 +558,39 @@ class DeepVideoAnalyzer:
         frame_number: int
     ) -> FrameAnalysis:
         """分析单个帧。"""
-        # 基础图像分析
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return self._analyze_single_frame_sync(frame, timestamp, frame_number)
+
+    def _analyze_single_frame_sync(
+        self,
+        frame: np.ndarray,
+        timestamp: float,
+        frame_number: int,
+        thumbnail: Optional[np.ndarray] = None,
+        motion_intensity: float = 0.0
+    ) -> FrameAnalysis:
+        """
+        分析单个帧的同步实现，可在线程池中执行。
+
+        运动强度需要与上一采样帧比较，由调用方计算后传入；单独分析一帧时为0。
+        """
+        if thumbnail is None:
+            thumbnail = self._make_thumbnail(frame)
+
+        # 基础图像分析，灰度图写入当前线程复用的缓冲区
+        gray = cv2.cvtColor(
+            frame, cv2.COLOR_BGR2GRAY, dst=self._thread_buffer("gray", frame.shape[:2])
+        )
 
         # 亮度计算
-        brightness = np.mean(gray) / 255.0
+        brightness = float(np.mean(gray)) / 255.0
 
         # 主要颜色提取
-        dominant_colors = self._extract_dominant_colors(frame)
+        dominant_colors = self._extract_dominant_colors(thumbnail)
 
         # 人脸检测
-        faces = self.face_cascade.detectMultiScale(gray, 1.1, 4)
+        faces = self._thread_face_cascade().detectMultiScale(gray, 1.1, 4)
         face_count = len(faces)
 
-        # 运动强度计算 (简化版本)
-        motion_intensity = self._calculate_motion_intensity(frame)
-
         # 场景类型识别
         scene_type = self._classify_scene_type(frame, face_count)
 
@@ -344,54 +613,63 @@ class DeepVideoAnalyzer:
             emotional_tone=emotional_tone
         )
 
-    def _extract_dominant_colors(self, frame: np.ndarray, k: int = 3) -> list[str]:
-        """提取主要颜色。"""
-        # 重塑图像数据
-        data = frame.reshape((-1, 3))
-        data = np.float32(data)
-
-        # K-means聚类
-        criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-        _, labels, centers = cv2.kmeans(data, k, None, criteria, 10, cv2.KMEANS_RANDOM_CENTERS)
-
-        # 转换为颜色名称
-        colors = []
-        for center in centers:
-            b, g, r = center.astype(int)
-            color_name = self._rgb_to_color_name(r, g, b)
-            colors.append(color_name)
-
-        return colors
-
-    def _rgb_to_color_name(self, r: int, g: int, b: int) -> str:
-        """将RGB值转换为颜色名称。"""
-        # 简化的颜色映射
-        if r > 200 and g > 200 and b > 200:
-            return "白色"
-        elif r < 50 and g < 50 and b < 50:
-            return "黑色"
-        elif r > g and r > b:
-            return "红色"
-        elif g > r and g > b:
-            return "绿色"
-        elif b > r and b > g:
-            return "蓝色"
-        elif r > 150 and g > 150:
-            return "黄色"
-        elif r > 150 and b > 150:
-            return "紫色"
-        elif g > 150 and b > 150:
-            return "青色"
-        else:
-            return "灰色"
+    def _thread_buffer(self, name: str, shape: tuple[int, ...]) -> np.ndarray:
+        """获取当前线程可复用的uint8缓冲区，尺寸变化时重新分配。"""
+        buffers = getattr(_CV_LOCAL, "buffers", None)
+        if buffers is None:
+            buffers = _CV_LOCAL.buffers = {}
+
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            buffers[name] = buffer
+        return buffer
+
+    def _thread_face_cascade(self) -> cv2.CascadeClassifier:
+        """获取当前线程的人脸检测器，CascadeClassifier不能在线程间共享。"""
+        if threading.current_thread() is threading.main_thread():
+            return self.face_cascade
+
+        cascade = getattr(_CV_LOCAL, "face_cascade", None)
+        if cascade is None:
+            cascade = cv2.CascadeClassifier(cv2.data.haarcascades + _FACE_CASCADE_FILE)
+            _CV_LOCAL.face_cascade = cascade
+        return cascade
+
+    def _make_thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """将画面缩小为缩略图。"""
+        return cv2.resize(frame, _THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+
+    def _extract_dominant_colors(self, thumbnail: np.ndarray, k: int = 3) -> list[str]:
+        """提取主要颜色，统计缩略图的颜色直方图即可，无需对全部像素做聚类。"""
+        # 每通道取高4位，打包为12位的颜色桶编号
+        bins = (
+            ((thumbnail[..., 2] >> 4).astype(np.uint16) << 8)
+            | ((thumbnail[..., 1] >> 4).astype(np.uint16) << 4)
+            | (thumbnail[..., 0] >> 4)
+        )
+        counts = np.bincount(bins.ravel(), minlength=4096)
+
+        # 取像素最多的k个颜色桶，按像素数从多到少排列
+        k = min(k, counts.size)
+        top = np.argpartition(counts, -k)[-k:]
+        top = top[np.argsort(counts[top])[::-1]]
+        # 画面颜色种类少于k时(纯色、淡入淡出、黑场)，去掉没有像素的空桶
+        top = top[counts[top] > 0]
 
-    def _calculate_motion_intensity(self, frame: np.ndarray) -> float:
-        """计算运动强度。"""
-        # 简化版本：基于边缘检测
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        motion_intensity = np.sum(edges) / (frame.shape[0] * frame.shape[1] * 255)
-        return min(motion_intensity, 1.0)
+        # 转换为颜色名称(取桶的中心值)
+        centers = np.stack([(top >> 8) & 0xF, (top >> 4) & 0xF, top & 0xF], axis=1) * 16 + 8
+        return _classify_colors(centers)
+
+    def _calculate_motion_intensity(
+        self,
+        gray: np.ndarray,
+        prev_gray: Optional[np.ndarray]
+    ) -> float:
+        """计算运动强度：相邻两个采样帧灰度缩略图的平均像素差。"""
+        if prev_gray is None:
+            return 0.0
+        return float(cv2.absdiff(gray, prev_gray).mean()) / 255.0
 
     def _classify_scene_type(self, frame: np.ndarray, face_count: int) -> str:
         """分类场景类型。"""
@@ -464,32 +742,30 @@ class DeepVideoAnalyzer:
     async def _analyze_audio(self, video_path: Path) -> list[AudioSegment]:
         """分析音频内容。"""
         try:
-            # 使用librosa加载音频
-            y, sr = librosa.load(str(video_path), sr=None)
+            y, sr = await asyncio.to_thread(self._load_audio, video_path)
             duration = len(y) / sr
 
             # 分段分析音频
             segment_length = 5.0  # 5秒一段
             segments = []
 
-            for i in range(0, int(duration), int(segment_length)):
-                start_time = i
-                end_time = min(i + segment_length, duration)
-
-                # 提取音频片段
-                start_sample = int(start_time * sr)
-                end_sample = int(end_time * sr)
-                segment_audio = y[start_sample:end_sample]
+            start_times = np.arange(0, int(duration), int(segment_length), dtype=np.float64)
+            if not len(start_times):
+                return segments
+            end_times = np.minimum(start_times + segment_length, duration)
 
-                # 分析音频特征
-                volume_level = np.mean(np.abs(segment_audio))
-
-                # 简单的音频类型分类
-                audio_type = self._classify_audio_type(segment_audio, sr)
+            # 一次算出所有片段的音量和音频类型
+            volumes, audio_types = await asyncio.to_thread(
+                self._classify_audio_segments, y, sr, start_times, end_times
+            )
 
+            for start_time, end_time, volume_level, audio_type in zip(
+                start_times.tolist(), end_times.tolist(), volumes, audio_types
+            ):
                 # 语音识别 (简化版本)
                 speech_text = None
                 if audio_type == "speech":
+                    segment_audio = y[int(start_time * sr):int(end_time * sr)]
                     speech_text = await self._recognize_speech(segment_audio, sr)
 
                 segment = AudioSegment(
@@ -511,26 +787,121 @@ class DeepVideoAnalyzer:
             self.logger.warning(f"音频分析失败: {e}")
             return []
 
-    def _classify_audio_type(self, audio: np.ndarray, sr: int) -> str:
-        """分类音频类型。"""
-        # 简化的音频分类
-        if np.max(np.abs(audio)) < 0.01:
-            return "silence"
+    def _load_audio(self, video_path: Path) -> tuple[np.ndarray, int]:
+        """加载音频为单声道float32数据，保持原始采样率。"""
+        # soundfile可直接读取的格式无需经过audioread
+        try:
+            y, sr = soundfile.read(str(video_path), dtype='float32')
+            return (y.mean(axis=1) if y.ndim == 2 else y), sr
+        except RuntimeError:
+            pass
+
+        # 视频容器中的音轨用PyAV解码并混为单声道
+        if av is not None:
+            try:
+                return self._decode_audio_av(video_path)
+            except Exception as e:
+                self.logger.debug(f"PyAV解码音频失败，改用librosa: {e}")
+
+        return librosa.load(str(video_path), sr=None)
+
+    def _decode_audio_av(self, video_path: Path) -> tuple[np.ndarray, int]:
+        """用PyAV解码视频中的音轨。"""
+        with av.open(str(video_path)) as container:
+            stream = container.streams.audio[0]
+            resampler = av.AudioResampler(format='flt', layout='mono', rate=stream.rate)
+
+            chunks = []
+            for frame in container.decode(stream):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray().reshape(-1))
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray().reshape(-1))
+
+        y = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+        return y, stream.rate
+
+    def _band_energies(self, y: np.ndarray, sr: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        计算整条音轨每个STFT帧的低频与高频平均幅度。
+
+        按块计算STFT并立即归约为两个频段的均值，第i个元素对应 i * _STFT_HOP 处的帧。
 
-        # 计算频谱特征
-        stft = librosa.stft(audio)
-        magnitude = np.abs(stft)
+        Returns:
+            (低频能量, 高频能量)，低频为最低1/4频段，高频为最高1/4频段
+        """
+        block = max(int(_STFT_BLOCK_SECONDS * sr) // _STFT_HOP, 1) * _STFT_HOP
+        low_blocks, high_blocks = [], []
 
-        # 基于频谱特征的简单分类
-        low_freq_energy = np.mean(magnitude[:magnitude.shape[0]//4])
-        high_freq_energy = np.mean(magnitude[3*magnitude.shape[0]//4:])
+        for start in range(0, len(y), block):
+            magnitude = np.abs(librosa.stft(y[start:start + block], hop_length=_STFT_HOP))
+            if start + block < len(y):
+                # 居中的STFT会在块尾多出一帧，丢弃后各块首尾相接
+                magnitude = magnitude[:, :block // _STFT_HOP]
 
-        if high_freq_energy > low_freq_energy * 2:
-            return "speech"
-        elif low_freq_energy > high_freq_energy * 1.5:
-            return "music"
-        else:
-            return "noise"
+            bins = magnitude.shape[0]
+            low_blocks.append(magnitude[:bins // 4].mean(axis=0))
+            high_blocks.append(magnitude[3 * bins // 4:].mean(axis=0))
+
+        if not low_blocks:
+            empty = np.zeros(1, dtype=np.float32)
+            return empty, empty
+        return np.concatenate(low_blocks), np.concatenate(high_blocks)
+
+    def _classify_audio_segments(
+        self,
+        y: np.ndarray,
+        sr: int,
+        start_times: np.ndarray,
+        end_times: np.ndarray
+    ) -> tuple[list[float], list[str]]:
+        """
+        批量计算首尾相接的各音频片段的音量(平均绝对振幅)和音频类型。
+
+        Args:
+            y: 单声道音频数据
+            sr: 采样率
+            start_times: 各片段开始时间(秒)
+            end_times: 各片段结束时间(秒)
+
+        Returns:
+            (音量列表, 音频类型列表)
+        """
+        # 整条音轨只做一次STFT，各片段取对应频谱列的平均幅度
+        low_energy, high_energy = self._band_energies(y, sr)
+
+        # 用前缀和一次求出每个片段的区间均值
+        def range_means(values: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+            sums = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+            return (sums[ends] - sums[starts]) / np.maximum(ends - starts, 1)
+
+        start_samples = (start_times * sr).astype(np.int64)
+        end_samples = np.minimum((end_times * sr).astype(np.int64), len(y))
+        amplitude = np.abs(y)
+        volumes = range_means(amplitude, start_samples, end_samples)
+        # 片段首尾相接，按片段起点分组即可一次求出各段峰值
+        peaks = np.maximum.reduceat(amplitude, start_samples)
+
+        columns_per_second = sr / _STFT_HOP
+        column_count = len(low_energy)
+        start_columns = np.minimum((start_times * columns_per_second).astype(np.int64), column_count - 1)
+        end_columns = np.clip(
+            (end_times * columns_per_second).astype(np.int64), start_columns + 1, column_count
+        )
+        low_freq_energy = range_means(low_energy, start_columns, end_columns)
+        high_freq_energy = range_means(high_energy, start_columns, end_columns)
+
+        # 简化的音频分类：静音优先，其余基于频谱特征
+        audio_types = np.select(
+            [
+                peaks < 0.01,
+                high_freq_energy > low_freq_energy * 2,
+                low_freq_energy > high_freq_energy * 1.5,
+            ],
+            ["silence", "speech", "music"],
+            default="noise"
+        )
+        return volumes.tolist(), audio_types.tolist()
 
     async def _recognize_speech(self, audio: np.ndarray, sr: int) -> Optional[str]:
         """语音识别。"""
@@ -549,46 +920,53 @@ class DeepVideoAnalyzer:
         video_path: Path
     ) -> list[SceneSegment]:
         """分析场景片段。"""
-        # 基于帧分析结果进行场景分割
-        scenes = []
-        current_scene_start = 0.0
-        current_scene_type = frame_analyses[0].scene_type if frame_analyses else "unknown"
-
-        for i, frame_analysis in enumerate(frame_analyses):
-            # 检测场景变化
-            if (frame_analysis.scene_type != current_scene_type or
-                i == len(frame_analyses) - 1):
-
-                # 结束当前场景
-                scene_end = frame_analysis.timestamp
-
-                # 使用AI生成场景描述
-                scene_description = await self._generate_scene_description(
-                    frame_analyses[max(0, i-5):i+1],  # 使用周围的帧
-                    audio_segments,
-                    current_scene_start,
-                    scene_end
-                )
+        if not frame_analyses:
+            return []
 
-                scene = SceneSegment(
-                    start_time=current_scene_start,
-                    end_time=scene_end,
-                    scene_id=f"scene_{len(scenes)+1}",
-                    scene_description=scene_description,
-                    location="未知",
-                    characters=[],
-                    actions=[],
-                    dialogue_summary="",
-                    emotional_arc=[],
-                    visual_style=current_scene_type,
-                    narrative_importance=0.5
-                )
+        # 基于帧分析结果进行场景分割：场景类型编码为整数后比较相邻帧，
+        # 类型变化的帧与最后一帧为各场景的结束帧
+        type_codes = {}
+        codes = np.array([
+            type_codes.setdefault(frame.scene_type, len(type_codes))
+            for frame in frame_analyses
+        ])
+        end_indices = (np.nonzero(codes[1:] != codes[:-1])[0] + 1).tolist()
+        if not end_indices or end_indices[-1] != len(frame_analyses) - 1:
+            end_indices.append(len(frame_analyses) - 1)
+
+        starts = [0.0] + [frame_analyses[i].timestamp for i in end_indices[:-1]]
+        ends = [frame_analyses[i].timestamp for i in end_indices]
+
+        # 使用AI批量生成各场景描述
+        descriptions = await self._generate_scene_descriptions_batched([
+            {
+                "frames": frame_analyses[max(0, i-5):i+1],  # 使用周围的帧
+                "start_time": scene_start,
+                "end_time": scene_end
+            }
+            for i, scene_start, scene_end in zip(end_indices, starts, ends)
+        ], audio_segments)
 
-                scenes.append(scene)
+        scenes = []
+        for i, scene_start, scene_end, scene_description in zip(
+            end_indices, starts, ends, descriptions
+        ):
+            scene = SceneSegment(
+                start_time=scene_start,
+                end_time=scene_end,
+                scene_id=f"scene_{len(scenes)+1}",
+                scene_description=scene_description,
+                location="未知",
+                characters=[],
+                actions=[],
+                dialogue_summary="",
+                emotional_arc=[],
+                # 场景在类型变化的帧结束，风格取该帧之前的场景类型
+                visual_style=frame_analyses[max(i - 1, 0)].scene_type,
+                narrative_importance=0.5
+            )
 
-                # 开始新场景
-                current_scene_start = scene_end
-                current_scene_type = frame_analysis.scene_type
+            scenes.append(scene)
 
         return scenes
 
@@ -601,35 +979,119 @@ class DeepVideoAnalyzer:
     ) -> str:
         """生成场景描述。"""
         # 构建场景分析提示词
-        prompt = f"""
-请基于以下视频分析数据，生成简洁的场景描述：
+        prompt = (
+            "\n请基于以下视频分析数据，生成简洁的场景描述：\n\n"
+            + self._format_scene_features(frame_analyses, audio_segments, start_time, end_time)
+            + "\n请用一句话描述这个场景的主要内容："
+        )
 
-时间段: {start_time:.1f}s - {end_time:.1f}s
+        try:
+            params = GenerationParams(max_tokens=100, temperature=0.3)
+            response = await self.llm_client.generate(prompt, params)
+            return response.text.strip()
+        except Exception as e:
+            self.logger.warning(f"场景描述生成失败: {e}")
+            return f"场景片段 {start_time:.1f}s-{end_time:.1f}s"
 
-视觉特征:
-"""
+    async def _generate_scene_descriptions_batched(
+        self,
+        scenes_data: list[dict[str, Any]],
+        audio_segments: list[AudioSegment]
+    ) -> list[str]:
+        """
+        合并请求生成多个场景的描述，每次请求最多包含 _SCENE_BATCH_SIZE 个场景。
+
+        Args:
+            scenes_data: 场景数据列表，每项包含 frames、start_time、end_time
+            audio_segments: 音频片段分析
+
+        Returns:
+            与场景顺序对应的描述列表
+        """
+        batches = [
+            scenes_data[i:i + _SCENE_BATCH_SIZE]
+            for i in range(0, len(scenes_data), _SCENE_BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(
+            self._generate_scene_description_batch(batch, audio_segments)
+            for batch in batches
+        ))
+        return [description for batch_result in results for description in batch_result]
+
+    async def _generate_scene_description_batch(
+        self,
+        scenes_data: list[dict[str, Any]],
+        audio_segments: list[AudioSegment]
+    ) -> list[str]:
+        """用一次请求生成一批场景的描述，缺失或解析失败的场景逐个重新生成。"""
+        if len(scenes_data) == 1:
+            scene = scenes_data[0]
+            return [await self._generate_scene_description(
+                scene["frames"], audio_segments, scene["start_time"], scene["end_time"]
+            )]
+
+        parts = ["\n请基于以下视频分析数据，为每个场景生成一句简洁的场景描述：\n"]
+        for idx, scene in enumerate(scenes_data, 1):
+            parts.append(f"\n## 场景{idx}\n")
+            parts.append(self._format_scene_features(
+                scene["frames"], audio_segments, scene["start_time"], scene["end_time"]
+            ))
+        parts.append(
+            "\n请只输出JSON数组，按场景顺序每个场景一项，格式如下：\n"
+            '[{"idx": 1, "description": "一句话场景描述"}]'
+        )
+
+        descriptions = {}
+        try:
+            params = GenerationParams(max_tokens=100 * len(scenes_data), temperature=0.3)
+            response = await self.llm_client.generate("".join(parts), params)
+            text = response.text
+            items = json.loads(text[text.index("["):text.rindex("]") + 1])
+            for item in items:
+                description = str(item.get("description", "")).strip()
+                if description:
+                    descriptions[int(item["idx"])] = description
+        except Exception as e:
+            self.logger.warning(f"批量场景描述生成失败，改为逐个生成: {e}")
+
+        # 未能从批量结果中取得描述的场景单独请求
+        missing = [idx for idx in range(1, len(scenes_data) + 1) if idx not in descriptions]
+        retried = await asyncio.gather(*(
+            self._generate_scene_description(
+                scenes_data[idx - 1]["frames"],
+                audio_segments,
+                scenes_data[idx - 1]["start_time"],
+                scenes_data[idx - 1]["end_time"]
+            )
+            for idx in missing
+        ))
+        descriptions.update(zip(missing, retried))
+
+        return [descriptions[idx] for idx in range(1, len(scenes_data) + 1)]
+
+    def _format_scene_features(
+        self,
+        frame_analyses: list[FrameAnalysis],
+        audio_segments: list[AudioSegment],
+        start_time: float,
+        end_time: float
+    ) -> str:
+        """格式化场景的时间段、视觉特征和音频特征，用于构建提示词。"""
+        lines = [f"时间段: {start_time:.1f}s - {end_time:.1f}s\n\n视觉特征:\n"]
 
         for frame in frame_analyses[-3:]:  # 使用最后3帧
-            prompt += f"- {frame.timestamp:.1f}s: {frame.scene_type}, 亮度{frame.brightness:.2f}, 人脸{frame.face_count}个, 情感{frame.emotional_tone}\n"
+            lines.append(f"- {frame.timestamp:.1f}s: {frame.scene_type}, 亮度{frame.brightness:.2f}, 人脸{frame.face_count}个, 情感{frame.emotional_tone}\n")
 
         # 添加音频信息
         relevant_audio = [seg for seg in audio_segments
                          if seg.start_time <= end_time and seg.end_time >= start_time]
 
         if relevant_audio:
-            prompt += "\n音频特征:\n"
+            lines.append("\n音频特征:\n")
             for audio in relevant_audio:
-                prompt += f"- {audio.audio_type}, 音量{audio.volume_level:.2f}\n"
+                lines.append(f"- {audio.audio_type}, 音量{audio.volume_level:.2f}\n")
 
-        prompt += "\n请用一句话描述这个场景的主要内容："
-
-        try:
-            params = GenerationParams(max_tokens=100, temperature=0.3)
-            response = await self.llm_client.generate(prompt, params)
-            return response.text.strip()
-        except Exception as e:
-            self.logger.warning(f"场景描述生成失败: {e}")
-            return f"场景片段 {start_time:.1f}s-{end_time:.1f}s"
+        return "".join(lines)
 
     async def _generate_overall_summary(
         self,
@@ -640,14 +1102,15 @@ class DeepVideoAnalyzer:
         """生成整体分析摘要。"""
         # 统计分析
         total_frames = len(frame_analyses)
-        avg_brightness = np.mean([f.brightness for f in frame_analyses])
-        dominant_emotions = {}
-
-        for frame in frame_analyses:
-            emotion = frame.emotional_tone
-            dominant_emotions[emotion] = dominant_emotions.get(emotion, 0) + 1
+        brightnesses = np.fromiter(
+            (f.brightness for f in frame_analyses), dtype=np.float64, count=total_frames
+        )
+        avg_brightness = float(brightnesses.mean()) if total_frames else 0.0
 
-        most_common_emotion = max(dominant_emotions.items(), key=lambda x: x[1])[0]
+        # Counter保持首次出现的顺序，数量相同时取最先出现的情感
+        emotion_counts = Counter(f.emotional_tone for f in frame_analyses)
+        dominant_emotions = dict(emotion_counts)
+        most_common_emotion = emotion_counts.most_common(1)[0][0] if emotion_counts else "neutral"
 
         # 音频统计
         speech_segments = [seg for seg in audio_segments if seg.audio_type == "speech"]
@@ -710,7 +1173,7 @@ class DeepVideoAnalyzer:
                 "timestamp": event["timestamp"],
                 "type": event["type"],
                 "description": self._get_event_description(event),
-                "data": asdict(event["data"]) if hasattr(event["data"], '__dict__') else event["data"]
+                "data": asdict(event["data"]) if is_dataclass(event["data"]) else event["data"]
             }
             timeline.append(timeline_item)
 
@@ -5,7 +5,10 @@ This module provides integration with Alibaba's Tongyi Qianwen platform
 using the DashScope API for Qwen series models.
 """
 
-from typing import Any
+import json
+from collections.abc import AsyncIterator
+from dataclasses import replace
+from typing import Any, Optional
 
 import httpx
 
@@ -98,6 +101,123 @@ class AlibabaTongyiClient(BaseLLMClient):
         Raises:
             LLMError: If request fails
         """
+        headers, payload = self._build_request(prompt, params)
+
+        try:
+            response = await self._client.post(
+                self.BASE_URL,
+                json=payload,
+                headers=headers,
+            )
+
+            # Handle HTTP errors
+            self._check_status(response)
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPError as e:
+            raise LLMError(
+                f"HTTP request failed: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+
+    async def stream(
+        self,
+        prompt: str,
+        params: Optional[GenerationParams] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from DashScope using server-sent events.
+
+        Incremental output is enabled so each event carries only new text.
+        Unlike ``generate``, streaming requests are not retried because
+        chunks may already have been consumed by the caller.
+
+        Args:
+            prompt: Input prompt
+            params: Generation parameters (uses defaults if None)
+
+        Yields:
+            Generated text chunks
+
+        Raises:
+            LLMError: If request fails
+        """
+        params = replace(params or GenerationParams(), stream=True)
+        self._check_model()
+        await self._enforce_rate_limit()
+
+        headers, payload = self._build_request(prompt, params)
+
+        try:
+            async with self._client.stream(
+                "POST",
+                self.BASE_URL,
+                json=payload,
+                headers=headers,
+            ) as response:
+                if response.status_code == 400:
+                    await response.aread()
+                self._check_status(response)
+
+                response.raise_for_status()
+                self._total_requests += 1
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+
+                    event = json.loads(line[5:])
+                    if event.get("code"):
+                        self._raise_api_error(
+                            event["code"], event.get("message", "Unknown error")
+                        )
+
+                    choices = event.get("output", {}).get("choices", [])
+                    if not choices:
+                        continue
+
+                    text = choices[0].get("message", {}).get("content", "")
+                    if text:
+                        yield text
+                    if choices[0].get("finish_reason") not in (None, "null"):
+                        # Usage is cumulative, so only the final event is counted
+                        self._total_tokens += event.get("usage", {}).get("total_tokens") or 0
+                        break
+
+        except LLMError:
+            # API errors reported inside the stream count like failed requests
+            self._total_errors += 1
+            raise
+        except ValueError as e:
+            self._total_errors += 1
+            raise LLMError(
+                f"Malformed stream event: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+        except httpx.HTTPError as e:
+            self._total_errors += 1
+            raise LLMError(
+                f"HTTP request failed: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+
+    def _build_request(
+        self,
+        prompt: str,
+        params: GenerationParams,
+    ) -> tuple[dict[str, str], dict[str, Any]]:
+        """
+        Build the request headers and payload for DashScope API.
+
+        Args:
+            prompt: Input prompt
+            params: Generation parameters
+
+        Returns:
+            Request headers and JSON payload
+        """
         # Prepare request headers
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -140,44 +260,39 @@ class AlibabaTongyiClient(BaseLLMClient):
             payload["parameters"]["incremental_output"] = True
             headers["X-DashScope-SSE"] = "enable"
 
-        try:
-            response = await self._client.post(
-                self.BASE_URL,
-                json=payload,
-                headers=headers,
-            )
+        return headers, payload
 
-            # Handle HTTP errors
-            if response.status_code == 429:
-                raise RateLimitError(
-                    "Rate limit exceeded",
-                    provider=self.provider_name,
-                    error_code="rate_limit",
-                )
-            elif response.status_code == 401:
-                raise AuthenticationError(
-                    "Invalid API key",
-                    provider=self.provider_name,
-                    error_code="invalid_api_key",
-                )
-            elif response.status_code == 400:
-                error_data = response.json() if response.content else {}
-                error_msg = error_data.get("message", "Bad request")
-                raise LLMError(
-                    f"Bad request: {error_msg}",
-                    provider=self.provider_name,
-                    error_code="bad_request",
-                    details=error_data,
-                )
+    def _check_status(self, response: httpx.Response) -> None:
+        """
+        Map DashScope HTTP error status codes to LLM errors.
 
-            response.raise_for_status()
-            return response.json()
+        Args:
+            response: HTTP response (body must be loaded for status 400)
 
-        except httpx.HTTPError as e:
+        Raises:
+            LLMError: If the status code indicates a known error
+        """
+        if response.status_code == 429:
+            raise RateLimitError(
+                "Rate limit exceeded",
+                provider=self.provider_name,
+                error_code="rate_limit",
+            )
+        elif response.status_code == 401:
+            raise AuthenticationError(
+                "Invalid API key",
+                provider=self.provider_name,
+                error_code="invalid_api_key",
+            )
+        elif response.status_code == 400:
+            error_data = response.json() if response.content else {}
+            error_msg = error_data.get("message", "Bad request")
             raise LLMError(
-                f"HTTP request failed: {str(e)}",
+                f"Bad request: {error_msg}",
                 provider=self.provider_name,
-            ) from e
+                error_code="bad_request",
+                details=error_data,
+            )
 
     def _parse_response(self, response: dict[str, Any]) -> LLMResponse:
         """
@@ -195,34 +310,10 @@ class AlibabaTongyiClient(BaseLLMClient):
         try:
             # Check for API errors
             if response.get("status_code") != 200:
-                error_code = response.get("code", "unknown")
-                error_msg = response.get("message", "Unknown error")
-
-                # Map specific error codes
-                if "InvalidApiKey" in error_code:
-                    raise AuthenticationError(
-                        f"Invalid API key: {error_msg}",
-                        provider=self.provider_name,
-                        error_code=error_code,
-                    )
-                elif "Throttling" in error_code or "FlowControl" in error_code:
-                    raise RateLimitError(
-                        f"Rate limit exceeded: {error_msg}",
-                        provider=self.provider_name,
-                        error_code=error_code,
-                    )
-                elif "DataInspection" in error_code:
-                    raise ContentFilterError(
-                        f"Content filtered: {error_msg}",
-                        provider=self.provider_name,
-                        error_code=error_code,
-                    )
-                else:
-                    raise LLMError(
-                        f"API error {error_code}: {error_msg}",
-                        provider=self.provider_name,
-                        error_code=error_code,
-                    )
+                self._raise_api_error(
+                    response.get("code", "unknown"),
+                    response.get("message", "Unknown error"),
+                )
 
             # Extract response data
             output = response.get("output", {})
@@ -268,6 +359,43 @@ class AlibabaTongyiClient(BaseLLMClient):
                 provider=self.provider_name,
             ) from e
 
+    def _raise_api_error(self, error_code: str, error_msg: str) -> None:
+        """
+        Raise the LLM error matching a DashScope error code.
+
+        Args:
+            error_code: DashScope error code
+            error_msg: Error message
+
+        Raises:
+            LLMError: Always
+        """
+        # Map specific error codes
+        if "InvalidApiKey" in error_code:
+            raise AuthenticationError(
+                f"Invalid API key: {error_msg}",
+                provider=self.provider_name,
+                error_code=error_code,
+            )
+        elif "Throttling" in error_code or "FlowControl" in error_code:
+            raise RateLimitError(
+                f"Rate limit exceeded: {error_msg}",
+                provider=self.provider_name,
+                error_code=error_code,
+            )
+        elif "DataInspection" in error_code:
+            raise ContentFilterError(
+                f"Content filtered: {error_msg}",
+                provider=self.provider_name,
+                error_code=error_code,
+            )
+        else:
+            raise LLMError(
+                f"API error {error_code}: {error_msg}",
+                provider=self.provider_name,
+                error_code=error_code,
+            )
+
     async def close(self) -> None:
         """Close the HTTP client."""
         await self._client.aclose()
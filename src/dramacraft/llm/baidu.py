@@ -5,7 +5,10 @@ This module provides integration with Baidu's Qianfan platform for ERNIE series
 Supports ERNIE-Bot, ERNIE-Bot-turbo, and other Baidu LLM models.
 """
 
+import json
 import time
+from collections.abc import AsyncIterator
+from dataclasses import replace
 from typing import Any, Optional
 
 import httpx
@@ -150,6 +153,128 @@ class BaiduQianfanClient(BaseLLMClient):
         Raises:
             LLMError: If request fails
         """
+        url, payload = await self._build_request(prompt, params)
+
+        try:
+            response = await self._client.post(
+                url,
+                json=payload,
+                headers={
+                    "Content-Type": "application/json",
+                }
+            )
+
+            # Handle HTTP errors
+            if response.status_code == 429:
+                raise RateLimitError(
+                    "Rate limit exceeded",
+                    provider=self.provider_name,
+                    error_code="rate_limit",
+                )
+
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.HTTPError as e:
+            raise LLMError(
+                f"HTTP request failed: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+
+    async def stream(
+        self,
+        prompt: str,
+        params: Optional[GenerationParams] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text from Baidu Qianfan using server-sent events.
+
+        Unlike ``generate``, streaming requests are not retried because
+        chunks may already have been consumed by the caller.
+
+        Args:
+            prompt: Input prompt
+            params: Generation parameters (uses defaults if None)
+
+        Yields:
+            Generated text chunks
+
+        Raises:
+            LLMError: If request fails
+        """
+        params = replace(params or GenerationParams(), stream=True)
+        self._check_model()
+        await self._enforce_rate_limit()
+
+        url, payload = await self._build_request(prompt, params)
+
+        try:
+            async with self._client.stream(
+                "POST",
+                url,
+                json=payload,
+                headers={
+                    "Content-Type": "application/json",
+                }
+            ) as response:
+                if response.status_code == 429:
+                    raise RateLimitError(
+                        "Rate limit exceeded",
+                        provider=self.provider_name,
+                        error_code="rate_limit",
+                    )
+
+                response.raise_for_status()
+                self._total_requests += 1
+
+                async for line in response.aiter_lines():
+                    # Errors are returned as a plain JSON body instead of SSE events
+                    if line.startswith("data:"):
+                        line = line[5:]
+                    elif not line.startswith("{"):
+                        continue
+
+                    event = json.loads(line)
+                    chunk = self._parse_response(event)
+                    if chunk.text:
+                        yield chunk.text
+                    if event.get("is_end"):
+                        # Usage is cumulative, so only the final event is counted
+                        self._total_tokens += chunk.tokens_used or 0
+                        break
+
+        except LLMError:
+            # API errors reported inside the stream count like failed requests
+            self._total_errors += 1
+            raise
+        except ValueError as e:
+            self._total_errors += 1
+            raise LLMError(
+                f"Malformed stream event: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+        except httpx.HTTPError as e:
+            self._total_errors += 1
+            raise LLMError(
+                f"HTTP request failed: {str(e)}",
+                provider=self.provider_name,
+            ) from e
+
+    async def _build_request(
+        self,
+        prompt: str,
+        params: GenerationParams,
+    ) -> tuple[str, dict[str, Any]]:
+        """
+        Build the request URL and payload for Baidu Qianfan API.
+
+        Args:
+            prompt: Input prompt
+            params: Generation parameters
+
+        Returns:
+            Request URL and JSON payload
+        """
         # Get access token
         access_token = await self._get_access_token()
 
@@ -186,31 +311,7 @@ class BaiduQianfanClient(BaseLLMClient):
         if params.stop_sequences:
             payload["stop"] = params.stop_sequences
 
-        try:
-            response = await self._client.post(
-                url,
-                json=payload,
-                headers={
-                    "Content-Type": "application/json",
-                }
-            )
-
-            # Handle HTTP errors
-            if response.status_code == 429:
-                raise RateLimitError(
-                    "Rate limit exceeded",
-                    provider=self.provider_name,
-                    error_code="rate_limit",
-                )
-
-            response.raise_for_status()
-            return response.json()
-
-        except httpx.HTTPError as e:
-            raise LLMError(
-                f"HTTP request failed: {str(e)}",
-                provider=self.provider_name,
-            ) from e
+        return url, payload
 
     def _parse_response(self, response: dict[str, Any]) -> LLMResponse:
         """
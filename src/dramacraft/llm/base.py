@@ -11,6 +11,7 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from collections.abc import AsyncIterator
 from typing import Any, Optional
 
 
@@ -230,11 +231,7 @@ class BaseLLMClient(ABC):
             params = GenerationParams()
 
         # Validate model
-        if self.model_name not in self.supported_models:
-            raise ModelNotFoundError(
-                f"Model '{self.model_name}' not supported by {self.provider_name}",
-                provider=self.provider_name
-            )
+        self._check_model()
 
         # Rate limiting
         await self._enforce_rate_limit()
@@ -280,6 +277,80 @@ class BaseLLMClient(ABC):
         if last_error:
             raise last_error
 
+    async def stream(
+        self,
+        prompt: str,
+        params: Optional[GenerationParams] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate text using the LLM, yielding chunks as they arrive.
+
+        The default implementation performs a regular ``generate`` call and
+        yields the whole text as a single chunk. Providers that support
+        server-sent events override this to yield incremental chunks.
+        Callers may stop iterating early; the generator should then be
+        closed with ``aclose()`` so the underlying request is released.
+
+        Args:
+            prompt: The input prompt
+            params: Generation parameters (uses defaults if None)
+
+        Yields:
+            Generated text chunks
+
+        Raises:
+            LLMError: If generation fails
+        """
+        response = await self.generate(prompt, params)
+        yield response.text
+
+    async def generate_many(
+        self,
+        prompts: list[str],
+        params: Optional[GenerationParams] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> list[LLMResponse]:
+        """
+        Generate text for several independent prompts concurrently.
+
+        All requests are submitted together so that backends with continuous
+        batching can schedule them side by side. Providers with a native
+        multi-prompt endpoint may override this.
+
+        Args:
+            prompts: Input prompts
+            params: Generation parameters shared by all prompts (uses defaults if None)
+            max_concurrency: Maximum number of requests in flight (unlimited if None)
+
+        Returns:
+            Generated responses in the same order as the prompts
+
+        Raises:
+            LLMError: If any generation fails
+        """
+        if max_concurrency is None:
+            return list(await asyncio.gather(
+                *(self.generate(prompt, params) for prompt in prompts)
+            ))
+
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def generate_limited(prompt: str) -> LLMResponse:
+            async with semaphore:
+                return await self.generate(prompt, params)
+
+        return list(await asyncio.gather(
+            *(generate_limited(prompt) for prompt in prompts)
+        ))
+
+    def _check_model(self) -> None:
+        """Raise ModelNotFoundError if the configured model is not supported."""
+        if self.model_name not in self.supported_models:
+            raise ModelNotFoundError(
+                f"Model '{self.model_name}' not supported by {self.provider_name}",
+                provider=self.provider_name
+            )
+
     async def _enforce_rate_limit(self) -> None:
         """Enforce rate limiting between requests."""
         current_time = time.time()
@@ -230,12 +230,19 @@ class PerformanceCache:
 class PerformanceMonitor:
     """性能监控器。"""
 
-    def __init__(self, metrics_retention: int = 1000):
+    def __init__(
+        self,
+        metrics_retention: int = 1000,
+        clock: Callable[[], float] = time.time,
+        start_monitoring: bool = True
+    ):
         """
         初始化性能监控器。
 
         Args:
             metrics_retention: 保留的指标数量
+            clock: 返回当前时间(秒)的时钟函数，测试时可替换为假时钟
+            start_monitoring: 是否启动后台指标收集线程
         """
         self.metrics_retention = metrics_retention
         self.metrics_history: deque = deque(maxlen=metrics_retention)
@@ -245,18 +252,21 @@ class PerformanceMonitor:
         self.total_requests = 0
         self.cache = PerformanceCache()
         self.logger = get_logger("monitoring.performance")
+        self._clock = clock
 
         # 监控线程
-        self._monitoring_active = True
-        self._monitoring_thread = threading.Thread(target=self._collect_metrics, daemon=True)
-        self._monitoring_thread.start()
+        self._monitoring_active = start_monitoring
+        self._monitoring_thread: Optional[threading.Thread] = None
+        if start_monitoring:
+            self._monitoring_thread = threading.Thread(target=self._collect_metrics, daemon=True)
+            self._monitoring_thread.start()
 
         # 弱引用集合，用于跟踪活跃任务
         self._active_tasks = weakref.WeakSet()
 
     def start_task(self, task_id: str, task_type: str) -> None:
         """开始任务监控。"""
-        current_time = time.time()
+        current_time = self._clock()
 
         task_metrics = TaskMetrics(
             task_id=task_id,
@@ -280,7 +290,7 @@ class PerformanceMonitor:
         if task_id not in self.task_metrics:
             return
 
-        current_time = time.time()
+        current_time = self._clock()
         task_metrics = self.task_metrics[task_id]
 
         task_metrics.end_time = current_time
@@ -298,12 +308,12 @@ class PerformanceMonitor:
 
     def record_api_call(self, response_time: float) -> None:
         """记录API调用。"""
-        current_time = time.time()
+        current_time = self._clock()
         self.api_call_times.append((current_time, response_time))
 
     def get_current_metrics(self) -> PerformanceMetrics:
         """获取当前性能指标。"""
-        current_time = time.time()
+        current_time = self._clock()
 
         # 计算每分钟API调用数
         minute_ago = current_time - 60
@@ -339,7 +349,7 @@ class PerformanceMonitor:
 
     def get_metrics_history(self, minutes: int = 60) -> list[PerformanceMetrics]:
         """获取历史指标。"""
-        cutoff_time = time.time() - (minutes * 60)
+        cutoff_time = self._clock() - (minutes * 60)
         return [m for m in self.metrics_history if m.timestamp > cutoff_time]
 
     def get_task_statistics(self) -> dict[str, Any]:
@@ -378,7 +388,7 @@ class PerformanceMonitor:
             "metrics_history": [asdict(m) for m in self.metrics_history],
             "task_statistics": self.get_task_statistics(),
             "cache_stats": self.cache.get_stats(),
-            "export_time": time.time()
+            "export_time": self._clock()
         }
 
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -388,7 +398,7 @@ class PerformanceMonitor:
 
     def cleanup_old_tasks(self, max_age_hours: int = 24) -> None:
         """清理旧的任务记录。"""
-        cutoff_time = time.time() - (max_age_hours * 3600)
+        cutoff_time = self._clock() - (max_age_hours * 3600)
         old_task_ids = [
             task_id for task_id, task in self.task_metrics.items()
             if task.end_time and task.end_time < cutoff_time
@@ -403,7 +413,7 @@ class PerformanceMonitor:
     def stop_monitoring(self) -> None:
         """停止监控。"""
         self._monitoring_active = False
-        if self._monitoring_thread.is_alive():
+        if self._monitoring_thread is not None and self._monitoring_thread.is_alive():
             self._monitoring_thread.join(timeout=5)
 
     def _collect_metrics(self) -> None:
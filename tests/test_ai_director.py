@@ -0,0 +1,179 @@
+"""
+AI导演模块测试。
+"""
+
+import copy
+import json
+import os
+import pickle
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from dramacraft.ai.director import (
+    AIDirector, EditingDecision, _JsonStreamScanner, _ResultCache, _extract_json
+)
+
+
+class TestEditingDecision:
+    """编辑决策测试类。"""
+
+    def test_pickle_and_copy_round_trip(self):
+        """测试冻结的编辑决策可被pickle和深拷贝。"""
+        decision = EditingDecision("cut", "video", {"start": 1.0}, 0.8, "节奏")
+
+        assert pickle.loads(pickle.dumps(decision)) == decision
+        copied = copy.deepcopy(decision)
+        assert copied == decision
+        assert copied.parameters is not decision.parameters
+
+
+class TestJsonStreamScanner:
+    """流式JSON扫描器测试类。"""
+
+    def test_escaped_quote_split_across_chunks(self):
+        """测试转义引号被拆分到两段文本时不会提前结束字符串。"""
+        scanner = _JsonStreamScanner()
+        chunks = ['结果：{"a": "say \\', '"hi\\"', ' }"}', '\n后记']
+
+        results = [scanner.feed(chunk) for chunk in chunks[:3]]
+
+        assert results[:2] == [None, None]
+        assert json.loads(results[2]) == {"a": 'say "hi" }'}
+
+    def test_stray_brace_before_json(self):
+        """测试正文中成对的零散花括号被跳过。"""
+        scanner = _JsonStreamScanner()
+
+        assert scanner.feed("注意{不是JSON}，结果：") is None
+        assert scanner.feed('{"b": 1}') == '{"b": 1}'
+
+    def test_unbalanced_stray_brace_falls_back_to_full_text(self):
+        """测试未闭合的零散花括号不会提前结束，完整文本仍可解析。"""
+        scanner = _JsonStreamScanner()
+
+        assert scanner.feed("用{表示对象，结果：") is None
+        assert scanner.feed('{"b": 1}') is None
+        assert _extract_json(scanner.text) == {"b": 1}
+
+    def test_truncated_object(self):
+        """测试被截断的对象不会被当作完整结果。"""
+        scanner = _JsonStreamScanner()
+
+        assert scanner.feed('{"a": [1, 2') is None
+        assert scanner.text == '{"a": [1, 2'
+        assert _extract_json(scanner.text) is None
+
+
+class TestResultCache:
+    """大模型结果缓存测试类。"""
+
+    def test_memory_hit_returns_copy(self):
+        """测试内存命中，且修改返回值不影响缓存。"""
+        cache = _ResultCache(None)
+        key = cache.make_key("analysis", "a.mp4")
+        cache.set(key, {"theme": "爱情", "highlights": [1]})
+
+        first = cache.get(key)
+        first["highlights"].append(2)
+
+        assert cache.get(key) == {"theme": "爱情", "highlights": [1]}
+
+    def test_disk_hit_after_new_instance(self, tmp_path):
+        """测试新实例从磁盘读取缓存。"""
+        key = _ResultCache.make_key("analysis", "a.mp4")
+        _ResultCache(tmp_path).set(key, {"theme": "悬疑"})
+
+        assert _ResultCache(tmp_path).get(key) == {"theme": "悬疑"}
+
+    def test_expired_entry_is_ignored(self, tmp_path):
+        """测试过期的内存与磁盘缓存都不会命中。"""
+        cache = _ResultCache(tmp_path, ttl=-1)
+        key = cache.make_key("analysis", "a.mp4")
+        cache.set(key, {"theme": "悬疑"})
+
+        assert cache.get(key) is None
+        assert _ResultCache(tmp_path, ttl=-1).get(key) is None
+
+    @pytest.mark.parametrize("content", ["不是时间戳\n{}", "9999999999.0\n{损坏的JSON"])
+    def test_corrupt_file_is_a_miss(self, tmp_path, content):
+        """测试损坏的缓存文件视为未命中。"""
+        key = _ResultCache.make_key("analysis", "a.mp4")
+        (tmp_path / f"{key}.json").write_text(content, encoding="utf-8")
+
+        assert _ResultCache(tmp_path).get(key) is None
+
+
+class TestDirectorCache:
+    """AI导演缓存使用测试类。"""
+
+    @pytest.fixture
+    def llm_client(self):
+        """返回固定文本的流式模拟客户端。"""
+        client = Mock()
+        client.provider_name = "mock"
+        client.model_name = "mock-model"
+        client.response_text = ""
+
+        async def stream(prompt, params=None):
+            yield client.response_text
+
+        client.stream = Mock(side_effect=stream)
+        return client
+
+    @pytest.fixture
+    def director(self, llm_client, tmp_path):
+        """创建使用临时缓存目录的AI导演。"""
+        return AIDirector(llm_client, Mock(), Mock(), cache_dir=tmp_path)
+
+    def test_analysis_key_changes_with_mtime(self, director, tmp_path):
+        """测试视频文件修改后分析缓存键随之改变。"""
+        video_path = tmp_path / "a.mp4"
+        video_path.write_bytes(b"video")
+        video_info = SimpleNamespace(path=video_path, size_mb=0.1, duration=10.0)
+
+        before = director._analysis_cache_key(video_info, "detailed")
+        stat = video_path.stat()
+        os.utime(video_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert director._analysis_cache_key(video_info, "detailed") != before
+
+    def test_keys_change_with_model(self, director, llm_client):
+        """测试切换模型后分析和编辑计划缓存键随之改变。"""
+        video_info = SimpleNamespace(path="a.mp4", size_mb=0.1, duration=10.0)
+        before = (
+            director._analysis_cache_key(video_info, "detailed"),
+            director._plan_cache_key({"theme": "爱情"}, "制作预告片", None)
+        )
+
+        llm_client.model_name = "other-model"
+
+        assert director._analysis_cache_key(video_info, "detailed") != before[0]
+        assert director._plan_cache_key({"theme": "爱情"}, "制作预告片", None) != before[1]
+
+    @pytest.mark.asyncio
+    async def test_empty_plan_is_not_cached(self, director, llm_client):
+        """测试没有决策的编辑计划不写入缓存。"""
+        llm_client.response_text = "暂时无法给出编辑计划"
+
+        plan = await director.create_editing_plan({"theme": "爱情"}, "制作预告片")
+        await director.create_editing_plan({"theme": "爱情"}, "制作预告片")
+
+        assert plan.decisions == []
+        assert llm_client.stream.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_plan_with_decisions_is_cached(self, director, llm_client):
+        """测试有决策的编辑计划命中缓存，不再请求大模型。"""
+        llm_client.response_text = json.dumps({
+            "project_name": "预告片",
+            "decisions": [{"action": "cut", "target": "video", "parameters": {}}]
+        })
+
+        first = await director.create_editing_plan({"theme": "爱情"}, "制作预告片")
+        second = await director.create_editing_plan({"theme": "爱情"}, "制作预告片")
+
+        assert first == second
+        assert len(second.decisions) == 1
+        assert llm_client.stream.call_count == 1
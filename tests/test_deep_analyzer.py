@@ -0,0 +1,157 @@
+"""
+深度视频分析器测试。
+"""
+
+from unittest.mock import AsyncMock, Mock
+
+import numpy as np
+import pytest
+
+from dramacraft.analysis.deep_analyzer import AudioSegment, DeepVideoAnalyzer, FrameAnalysis
+
+
+def _frame(timestamp: float, scene_type: str) -> FrameAnalysis:
+    """创建指定时间和场景类型的帧分析结果。"""
+    return FrameAnalysis(
+        timestamp=timestamp,
+        frame_number=int(timestamp * 30),
+        scene_type=scene_type,
+        dominant_colors=["蓝色"],
+        brightness=0.5,
+        motion_intensity=0.1,
+        face_count=0,
+        objects=[],
+        composition="balanced",
+        emotional_tone="calm"
+    )
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    """创建使用临时缓存目录、大模型返回固定描述的分析器。"""
+    llm_client = Mock()
+    llm_client.generate = AsyncMock(return_value=Mock(text="场景描述"))
+    return DeepVideoAnalyzer(llm_client, cache_dir=tmp_path)
+
+
+class TestAudioSegments:
+    """音频分段分析测试类。"""
+
+    SAMPLE_RATE = 8000
+
+    def _tone(self, seconds: float, amplitude: float = 0.5) -> np.ndarray:
+        t = np.arange(int(seconds * self.SAMPLE_RATE)) / self.SAMPLE_RATE
+        return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+    async def _segments(self, analyzer, y: np.ndarray) -> list[AudioSegment]:
+        analyzer._load_audio = lambda video_path: (y, self.SAMPLE_RATE)
+        return await analyzer._analyze_audio(None)
+
+    @pytest.mark.asyncio
+    async def test_silence(self, analyzer):
+        """测试静音片段的分类和音量。"""
+        segments = await self._segments(analyzer, np.zeros(10 * self.SAMPLE_RATE, np.float32))
+
+        assert [seg.audio_type for seg in segments] == ["silence", "silence"]
+        assert [seg.volume_level for seg in segments] == [0.0, 0.0]
+
+    @pytest.mark.asyncio
+    async def test_short_last_segment(self, analyzer):
+        """测试最后一个不足5秒的片段只统计其自身的音频。"""
+        y = np.concatenate([self._tone(10.0), np.zeros(int(2.5 * self.SAMPLE_RATE), np.float32)])
+
+        segments = await self._segments(analyzer, y)
+
+        assert [(seg.start_time, seg.end_time) for seg in segments] == [
+            (0.0, 5.0), (5.0, 10.0), (10.0, 12.5)
+        ]
+        # 正弦波的平均绝对振幅为 2A/π
+        assert segments[0].volume_level == pytest.approx(0.5 * 2 / np.pi, rel=1e-2)
+        assert segments[2].audio_type == "silence"
+        assert segments[2].volume_level == 0.0
+
+    @pytest.mark.asyncio
+    async def test_audio_shorter_than_one_segment(self, analyzer):
+        """测试短于一个分段的音频。"""
+        segments = await self._segments(analyzer, self._tone(3.0))
+
+        assert len(segments) == 1
+        assert (segments[0].start_time, segments[0].end_time) == (0.0, 3.0)
+        assert segments[0].audio_type != "silence"
+
+        assert await self._segments(analyzer, self._tone(0.5)) == []
+
+
+class TestSceneBoundaries:
+    """场景分割测试类。"""
+
+    async def _scene_spans(self, analyzer, scene_types: list[str]) -> list[tuple]:
+        frames = [_frame(float(i), scene_type) for i, scene_type in enumerate(scene_types)]
+        scenes = await analyzer._analyze_scenes(frames, [], None)
+        return [(scene.start_time, scene.end_time, scene.visual_style) for scene in scenes]
+
+    @pytest.mark.asyncio
+    async def test_single_frame(self, analyzer):
+        """测试只有一帧时生成一个场景。"""
+        assert await self._scene_spans(analyzer, ["close_up"]) == [(0.0, 0.0, "close_up")]
+
+    @pytest.mark.asyncio
+    async def test_no_change(self, analyzer):
+        """测试场景类型不变时整段为一个场景。"""
+        spans = await self._scene_spans(analyzer, ["wide_shot"] * 3)
+
+        assert spans == [(0.0, 2.0, "wide_shot")]
+
+    @pytest.mark.asyncio
+    async def test_change_on_last_frame(self, analyzer):
+        """测试最后一帧发生变化时场景在该帧结束。"""
+        spans = await self._scene_spans(analyzer, ["wide_shot", "wide_shot", "close_up"])
+
+        assert spans == [(0.0, 2.0, "wide_shot")]
+
+    @pytest.mark.asyncio
+    async def test_change_in_middle(self, analyzer):
+        """测试中间变化时前后各成一个场景。"""
+        spans = await self._scene_spans(analyzer, ["wide_shot", "close_up", "close_up"])
+
+        assert spans == [(0.0, 1.0, "wide_shot"), (1.0, 2.0, "close_up")]
+
+    @pytest.mark.asyncio
+    async def test_no_frames(self, analyzer):
+        """测试没有帧时不生成场景。"""
+        assert await self._scene_spans(analyzer, []) == []
+
+
+class TestAnalysisCache:
+    """分析结果缓存测试类。"""
+
+    def test_round_trip(self, analyzer, tmp_path):
+        """测试写入的帧分析结果可原样读回。"""
+        video_path = tmp_path / "a.mp4"
+        video_path.write_bytes(b"video")
+        frames = [_frame(0.0, "wide_shot"), _frame(1.0, "close_up")]
+
+        cache_path = analyzer._cache_path(video_path, "frames", 1.0, None)
+        analyzer._save_cache(cache_path, frames)
+
+        assert analyzer._load_cache(cache_path, FrameAnalysis) == frames
+
+    def test_empty_result_not_saved(self, analyzer, tmp_path):
+        """测试空结果不写入缓存。"""
+        video_path = tmp_path / "a.mp4"
+        video_path.write_bytes(b"video")
+
+        cache_path = analyzer._cache_path(video_path, "audio")
+        analyzer._save_cache(cache_path, [])
+
+        assert analyzer._load_cache(cache_path, AudioSegment) is None
+
+    def test_corrupt_file_is_a_miss(self, analyzer, tmp_path):
+        """测试损坏的缓存文件视为未命中。"""
+        video_path = tmp_path / "a.mp4"
+        video_path.write_bytes(b"video")
+
+        cache_path = analyzer._cache_path(video_path, "frames", 1.0, None)
+        cache_path.write_text("[{\"timestamp\": ", encoding="utf-8")
+
+        assert analyzer._load_cache(cache_path, FrameAnalysis) is None
@@ -0,0 +1,40 @@
+"""
+文档统计脚本测试。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from docs_stats import analyze_markdown_file
+
+
+class TestWordCount:
+    """字数统计测试类。"""
+
+    # 期望值为单遍扫描重构前 count_words 的统计结果
+    @pytest.mark.parametrize("content, expected", [
+        ("Use _emphasis_ and **bold** with snake_case in dramacraft_server, "
+         "see `code` 中文abc 混合 text.", 15),
+        ("# 标题 Title\n\n普通段落，包含 English words 和 `inline_code`。<br>HTML<b>bold</b>", 14),
+        ("| a_b | c |\n|---|---|\n| 中文 | x |", 5),
+    ])
+    def test_matches_baseline(self, tmp_path, content, expected):
+        """测试不含链接和代码块的正文字数与原实现一致。"""
+        md_file = tmp_path / "page.md"
+        md_file.write_text(content, encoding="utf-8")
+
+        assert analyze_markdown_file(md_file)["words"] == expected
+
+    def test_link_text_counted(self, tmp_path):
+        """测试链接文字计入字数，链接地址不计入。"""
+        md_file = tmp_path / "page.md"
+        md_file.write_text("见 [snake_case 文档](https://example.com/a_b) 和 [指南](guide.md)", encoding="utf-8")
+
+        stats = analyze_markdown_file(md_file)
+
+        assert stats["words"] == 7
+        assert (stats["internal_links"], stats["external_links"]) == (1, 1)
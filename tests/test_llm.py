@@ -4,6 +4,7 @@ LLM模块测试。
 
 import pytest
 import asyncio
+import httpx
 from unittest.mock import Mock, AsyncMock, patch
 
 from dramacraft.llm.base import (
@@ -14,6 +15,8 @@ from dramacraft.llm.base import (
     RateLimitError,
     AuthenticationError
 )
+from dramacraft.llm.alibaba import AlibabaTongyiClient
+from dramacraft.llm.baidu import BaiduQianfanClient
 from dramacraft.llm.factory import create_llm_client
 from dramacraft.config import LLMConfig
 
@@ -91,7 +94,28 @@ class TestBaseLLMClient:
         
         with pytest.raises(LLMError):
             await mock_client.generate("test prompt")
-    
+
+    @pytest.mark.asyncio
+    async def test_stream_falls_back_to_generate(self, mock_client):
+        """测试默认流式接口一次性返回完整文本。"""
+        chunks = [chunk async for chunk in mock_client.stream("测试提示词")]
+
+        assert len(chunks) == 1
+        assert "Mock response" in chunks[0]
+        assert mock_client.get_statistics()["total_requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_generate_many_keeps_order(self, mock_client):
+        """测试批量生成按提示词顺序返回结果。"""
+        prompts = ["第一个提示词", "第二个提示词", "第三个提示词"]
+
+        responses = await mock_client.generate_many(prompts, max_concurrency=2)
+
+        assert [response.text for response in responses] == [
+            f"Mock response for: {prompt}..." for prompt in prompts
+        ]
+        assert mock_client.get_statistics()["total_requests"] == 3
+
     def test_statistics(self, mock_client):
         """测试统计信息。"""
         stats = mock_client.get_statistics()
@@ -122,6 +146,53 @@ class TestBaseLLMClient:
         assert stats["total_errors"] == 0
 
 
+def _use_sse_body(client: BaseLLMClient, body: str) -> None:
+    """让客户端的HTTP请求都返回给定的流式响应内容。"""
+    client._client = httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, text=body))
+    )
+
+
+class TestStreamErrors:
+    """流式接口错误处理测试类。"""
+
+    async def _consume(self, client: BaseLLMClient) -> list:
+        return [chunk async for chunk in client.stream("测试提示词")]
+
+    @pytest.mark.asyncio
+    async def test_alibaba_malformed_event(self):
+        """测试通义千问流中的损坏事件转换为LLMError。"""
+        client = AlibabaTongyiClient(api_key="test_key")
+        _use_sse_body(client, 'data:{"output": {"choices": [\n\n')
+
+        with pytest.raises(LLMError):
+            await self._consume(client)
+        assert client.get_statistics()["total_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_alibaba_error_event_counted(self):
+        """测试通义千问流中的错误事件计入错误统计。"""
+        client = AlibabaTongyiClient(api_key="test_key")
+        _use_sse_body(client, 'data:{"code": "Throttling", "message": "busy"}\n\n')
+
+        with pytest.raises(RateLimitError):
+            await self._consume(client)
+        assert client.get_statistics()["total_errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_baidu_truncated_event(self):
+        """测试千帆流中被截断的事件转换为LLMError。"""
+        client = BaiduQianfanClient(
+            api_key="test_key", secret_key="test_secret", model_name="ERNIE-Bot-turbo"
+        )
+        client._get_access_token = AsyncMock(return_value="test_token")
+        _use_sse_body(client, 'data: {"result": "你好\n\n')
+
+        with pytest.raises(LLMError):
+            await self._consume(client)
+        assert client.get_statistics()["total_errors"] == 1
+
+
 class TestGenerationParams:
     """生成参数测试类。"""
     
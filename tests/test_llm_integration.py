@@ -4,6 +4,7 @@ LLM集成测试模块。
 测试各种大模型API的集成功能，包括百度千帆、阿里通义等。
 """
 
+import os
 import pytest
 import asyncio
 from unittest.mock import Mock, AsyncMock, patch
@@ -15,6 +16,10 @@ from src.dramacraft.llm.alibaba import AlibabaLLMClient
 from src.dramacraft.llm.factory import create_llm_client
 from src.dramacraft.config import LLMConfig
 
+# 各厂商SDK可能遗留连接和文件句柄，逐个测试在子进程中运行
+# 没有os.fork的平台(Windows)上直接在当前进程中运行
+pytestmark = [pytest.mark.forked] if hasattr(os, "fork") else []
+
 
 class TestBaseLLMClient:
     """基础LLM客户端测试。"""
@@ -4,6 +4,7 @@ MCP服务器测试模块。
 测试Model Context Protocol服务器的实现和工具功能。
 """
 
+import os
 import pytest
 import asyncio
 import json
@@ -15,6 +16,10 @@ from src.dramacraft.server import DramaCraftServer
 from src.dramacraft.config import DramaCraftConfig
 from src.dramacraft.llm.base import BaseLLMClient, GenerationResult
 
+# 服务器会加载全部工具子模块，每个测试在独立子进程中运行
+# 没有os.fork的平台(Windows)上直接在当前进程中运行
+pytestmark = [pytest.mark.forked] if hasattr(os, "fork") else []
+
 
 class MockLLMClient(BaseLLMClient):
     """模拟LLM客户端。"""
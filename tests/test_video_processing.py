@@ -4,6 +4,7 @@
 测试视频分析、处理和剪映集成功能。
 """
 
+import os
 import pytest
 import tempfile
 import json
@@ -16,6 +17,10 @@ from src.dramacraft.video.jianying_format import JianYingFormatConverter, JianYi
 from src.dramacraft.video.jianying_control import JianYingController, JianYingCommand, JianYingOperation
 from src.dramacraft.analysis.deep_analyzer import DeepVideoAnalyzer, FrameAnalysis, SceneSegment
 
+# OpenCV可能触发段错误，fork隔离后不会中断整个测试套件
+# 没有os.fork的平台(Windows)上直接在当前进程中运行
+pytestmark = [pytest.mark.forked] if hasattr(os, "fork") else []
+
 
 class TestVideoProcessor:
     """视频处理器测试。"""